@@ -2,18 +2,21 @@
 Entry point for running AIM MCP server via `python -m aim_mcp_server`
 """
 
+import argparse
 import asyncio
+import contextlib
 import sys
+from typing import Any, AsyncIterator, Coroutine
+from mcp.server import Server
+
+from .agents.registry import AgentRegistry
 from .server import create_server
 
 
-async def main() -> None:
-    """Main entry point for the AIM MCP server."""
+async def run_stdio(server: Server) -> None:
+    """Run the server over stdin/stdout."""
     from mcp.server.stdio import stdio_server
     
-    server = create_server()
-    
-    # Run the server using stdio transport
     # stdio_server() provides the read/write streams from stdin/stdout
     async with stdio_server() as (read_stream, write_stream):
         await server.run(
@@ -23,12 +26,92 @@ async def main() -> None:
         )
 
 
+async def run_http(server: Server, host: str, port: int) -> None:
+    """
+    Run the server over the streamable HTTP transport.
+    
+    The MCP endpoint is served at http://<host>:<port>/mcp. Clients keep a
+    connection open across requests instead of framing every message
+    through stdio.
+    """
+    import uvicorn
+    from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+    from starlette.applications import Starlette
+    from starlette.routing import Mount
+    from starlette.types import Receive, Scope, Send
+    
+    session_manager = StreamableHTTPSessionManager(app=server)
+    
+    async def handle_mcp(scope: Scope, receive: Receive, send: Send) -> None:
+        await session_manager.handle_request(scope, receive, send)
+    
+    @contextlib.asynccontextmanager
+    async def lifespan(app: Starlette) -> AsyncIterator[None]:
+        async with session_manager.run():
+            yield
+    
+    app = Starlette(routes=[Mount("/mcp", app=handle_mcp)], lifespan=lifespan)
+    
+    # uvicorn picks httptools for HTTP parsing when it is installed
+    config = uvicorn.Config(app, host=host, port=port, log_level="warning")
+    await uvicorn.Server(config).serve()
+
+
+async def main(transport: str = "stdio", host: str = "127.0.0.1", port: int = 8000) -> None:
+    """
+    Main entry point for the AIM MCP server.
+    
+    Args:
+        transport: "stdio" (default) or "http"
+        host: Interface to bind for the HTTP transport
+        port: Port to bind for the HTTP transport
+    """
+    agent_registry = AgentRegistry()
+    server = create_server(agent_registry)
+    
+    try:
+        if transport == "http":
+            await run_http(server, host, port)
+        else:
+            await run_stdio(server)
+    finally:
+        # Finish queued work and close shared API clients; for HTTP this
+        # runs after uvicorn has shut the Starlette app down
+        await agent_registry.close()
+
+
+def run(coro: Coroutine[Any, Any, None]) -> None:
+    """Run a coroutine on uvloop when available, else the default event loop."""
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(coro)
+        return
+    
+    uvloop.run(coro)
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(prog="python -m aim_mcp_server", description="AIM MCP server")
+    parser.add_argument(
+        "--transport",
+        choices=["stdio", "http"],
+        default="stdio",
+        help="MCP transport to serve (default: stdio)"
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="HTTP bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="HTTP port (default: 8000)")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
+    args = parse_args()
+    
     try:
-        asyncio.run(main())
+        run(main(args.transport, args.host, args.port))
     except KeyboardInterrupt:
         sys.exit(0)
     except Exception as e:
         print(f"Fatal error: {e}", file=sys.stderr)
         sys.exit(1)
-
@@ -1,9 +1,27 @@
 """Agent interfaces and implementations."""
 
+import importlib
+from typing import Any
+
 from .base import Agent, AgentType, AgentCapability
-from .claude import ClaudeAgent
-from .claude_code import ClaudeCodeAgent
 from .registry import AgentRegistry
 
 __all__ = ["Agent", "AgentType", "AgentCapability", "ClaudeAgent", "ClaudeCodeAgent", "AgentRegistry"]
 
+# Agent implementations are imported on first access (PEP 562) so that
+# importing the package does not pull in the anthropic SDK
+_LAZY_EXPORTS = {
+    "ClaudeAgent": ".claude",
+    "ClaudeCodeAgent": ".claude_code",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
@@ -0,0 +1,73 @@
+"""
+In-memory LRU cache for agent responses.
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+def prompt_key(model: str, system_prompt: str, user_prompt: str) -> bytes:
+    """
+    Build a compact cache key for a prompt.
+    
+    Args:
+        model: Model the prompt is sent to
+        system_prompt: System prompt text
+        user_prompt: User prompt text
+    
+    Returns:
+        16-byte digest identifying the request
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (model, system_prompt, user_prompt):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.digest()
+
+
+class LRUCache:
+    """
+    Least-recently-used cache holding a fixed number of entries.
+    
+    Operations never await, so a single instance can be shared by all
+    coroutines running on the event loop.
+    """
+    
+    def __init__(self, maxsize: int = 1024):
+        """
+        Initialize cache.
+        
+        Args:
+            maxsize: Maximum number of entries kept
+        """
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Any, Any]" = OrderedDict()
+    
+    def get(self, key: Any) -> Optional[Any]:
+        """Get a cached value, marking it as recently used."""
+        value = self._entries.get(key)
+        
+        if value is not None:
+            self._entries.move_to_end(key)
+        
+        return value
+    
+    def put(self, key: Any, value: Any) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    def pop(self, key: Any) -> Optional[Any]:
+        """Remove an entry if present, returning its value."""
+        return self._entries.pop(key, None)
+    
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -2,10 +2,11 @@
 Abstract base classes for AI agents.
 """
 
+import re
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Literal, Optional, Tuple
 
 
 class AgentType(Enum):
@@ -27,7 +28,11 @@ class AgentCapability(Enum):
     REFACTORING = "refactoring"
 
 
-@dataclass
+# Every capability, for agents that can do anything
+ALL_CAPABILITIES: Tuple[AgentCapability, ...] = tuple(AgentCapability)
+
+
+@dataclass(slots=True)
 class AgentTask:
     """Represents a task to be executed by an agent."""
     id: str
@@ -38,7 +43,7 @@ class AgentTask:
     feedback: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentOutput:
     """Output from an agent execution."""
     task_id: str
@@ -48,19 +53,58 @@ class AgentOutput:
     error: Optional[str] = None
 
 
+TaskTier = Literal["fast", "mid", "frontier"]
+
+# Mechanical edits that a small model handles well
+FAST_TIER_PATTERN = re.compile(r"\b(?:rename|reformat|typos?|imports?)\b", re.IGNORECASE)
+
+# Work that needs deep reasoning
+FRONTIER_TIER_PATTERN = re.compile(
+    r"\b(?:architect\w*|security audit|debug why)\b", re.IGNORECASE
+)
+
+# Longer descriptions are never considered simple
+FAST_TIER_MAX_LENGTH = 200
+
+
+def classify_task_tier(task: AgentTask) -> TaskTier:
+    """
+    Classify how much model capability a task needs.
+    
+    Only short descriptions of mechanical edits are routed down; anything
+    uncertain stays on the mid tier.
+    
+    Args:
+        task: The task to classify
+    
+    Returns:
+        "fast", "mid" or "frontier"
+    """
+    description = task.description
+    
+    if FRONTIER_TIER_PATTERN.search(description):
+        return "frontier"
+    
+    if len(description) <= FAST_TIER_MAX_LENGTH and FAST_TIER_PATTERN.search(description):
+        return "fast"
+    
+    return "mid"
+
+
 class Agent(ABC):
     """Abstract base class for all AI agents."""
     
-    def __init__(self, agent_type: AgentType, capabilities: List[AgentCapability]):
+    def __init__(self, agent_type: AgentType, capabilities: Iterable[AgentCapability]):
         """
         Initialize an agent.
         
         Args:
             agent_type: The type of agent
-            capabilities: List of capabilities this agent has
+            capabilities: Capabilities this agent has
         """
         self.agent_type = agent_type
-        self.capabilities = capabilities
+        # Hashed, immutable set for O(1) capability checks
+        self.capabilities: FrozenSet[AgentCapability] = frozenset(capabilities)
     
     @abstractmethod
     async def execute(self, task: AgentTask) -> AgentOutput:
@@ -75,6 +119,52 @@ class Agent(ABC):
         """
         pass
     
+    async def execute_many(self, tasks: List[AgentTask]) -> List[AgentOutput]:
+        """
+        Execute several tasks.
+        
+        The default implementation runs the tasks one after another; agents
+        backed by a bulk API can override this.
+        
+        Args:
+            tasks: The tasks to execute
+        
+        Returns:
+            Agent outputs in the same order as the tasks
+        """
+        return [await self.execute(task) for task in tasks]
+    
+    async def execute_streaming(
+        self,
+        task: AgentTask,
+        on_delta: Callable[[str], bool]
+    ) -> AgentOutput:
+        """
+        Execute a task, passing output text to on_delta as it is produced.
+        
+        The default implementation has nothing to stream: it calls on_delta
+        once with the complete output. Agents backed by a streaming API can
+        override this so on_delta sees chunks and can stop generation early.
+        
+        Args:
+            task: The task to execute
+            on_delta: Called with output text; return True to stop early
+        
+        Returns:
+            The agent's output
+        """
+        output = await self.execute(task)
+        
+        if output.success and output.output:
+            on_delta(str(output.output))
+        
+        return output
+    
+    @property
+    def supports_batching(self) -> bool:
+        """Whether execute_many() sends tasks in bulk rather than one by one."""
+        return False
+    
     @abstractmethod
     async def validate_capability(self, capability: AgentCapability) -> bool:
         """
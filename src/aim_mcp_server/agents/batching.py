@@ -0,0 +1,120 @@
+"""
+Coalescing of agent executions from concurrent callers into batches.
+"""
+
+import asyncio
+from typing import Dict, List, Optional, Set, Tuple
+
+from .base import Agent, AgentTask, AgentOutput
+
+
+class BatchDispatcher:
+    """
+    Collects tasks submitted by concurrent coroutines and hands them to
+    agents in bulk via execute_many().
+    
+    A batch is flushed once max_batch_size tasks are pending or
+    flush_interval_ms has passed since the first of them was submitted.
+    Agents that do not support batching are called directly, so callers
+    can always go through execute().
+    """
+    
+    def __init__(self, max_batch_size: int = 16, flush_interval_ms: float = 50.0):
+        """
+        Initialize dispatcher.
+        
+        Args:
+            max_batch_size: Flush as soon as this many tasks are pending
+            flush_interval_ms: Longest time a task waits for others to join
+        """
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval_ms / 1000.0
+        self._pending: List[Tuple[Agent, AgentTask, "asyncio.Future[AgentOutput]"]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._dispatches: Set[asyncio.Future] = set()
+    
+    async def execute(self, agent: Agent, task: AgentTask) -> AgentOutput:
+        """
+        Execute a task, batched with other pending tasks when possible.
+        
+        Args:
+            agent: Agent that should run the task
+            task: The task to execute
+        
+        Returns:
+            The agent's output
+        """
+        if not agent.supports_batching:
+            return await agent.execute(task)
+        
+        return await self.submit(agent, task)
+    
+    def submit(self, agent: Agent, task: AgentTask) -> "asyncio.Future[AgentOutput]":
+        """
+        Queue a task for the next batch.
+        
+        Args:
+            agent: Agent that should run the task
+            task: The task to execute
+        
+        Returns:
+            Future resolved with the agent's output
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((agent, task, future))
+        
+        if len(self._pending) >= self.max_batch_size:
+            self.flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.flush_interval, self.flush)
+        
+        return future
+    
+    def flush(self) -> None:
+        """Dispatch all pending tasks now."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        
+        # Keep a reference so the dispatch is not garbage collected mid-flight
+        dispatch = asyncio.ensure_future(self._dispatch(batch))
+        self._dispatches.add(dispatch)
+        dispatch.add_done_callback(self._dispatches.discard)
+    
+    async def _dispatch(
+        self,
+        batch: List[Tuple[Agent, AgentTask, "asyncio.Future[AgentOutput]"]]
+    ) -> None:
+        """Run one execute_many() call per agent and resolve the futures."""
+        groups: Dict[int, Tuple[Agent, list]] = {}
+        for agent, task, future in batch:
+            groups.setdefault(id(agent), (agent, []))[1].append((task, future))
+        
+        async def _run_group(agent: Agent, entries: list) -> None:
+            try:
+                outputs = await agent.execute_many([task for task, _ in entries])
+                # A short result list would leave some futures (and their
+                # refinements) waiting forever
+                if len(outputs) != len(entries):
+                    raise RuntimeError(
+                        f"execute_many() returned {len(outputs)} outputs for {len(entries)} tasks"
+                    )
+            except Exception as e:
+                for _, future in entries:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            
+            for (_, future), output in zip(entries, outputs):
+                if not future.done():
+                    future.set_result(output)
+        
+        await asyncio.gather(*[
+            _run_group(agent, entries) for agent, entries in groups.values()
+        ])
+
@@ -2,11 +2,88 @@
 Claude AI agent implementation.
 """
 
+import asyncio
 import os
-from typing import List, Optional
-from anthropic import Anthropic, AsyncAnthropic
+import random
+import time
+from dataclasses import replace
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, TypeVar, cast
+from anthropic import Anthropic, AsyncAnthropic, APIConnectionError, APIStatusError
+from anthropic.types.message_create_params import MessageCreateParamsNonStreaming
+from anthropic.types.messages.batch_create_params import Request
 
-from .base import Agent, AgentType, AgentCapability, AgentTask, AgentOutput
+from ._cache import LRUCache, prompt_key
+from .base import ALL_CAPABILITIES, Agent, AgentType, AgentCapability, AgentTask, AgentOutput, classify_task_tier
+
+T = TypeVar("T")
+
+# Polling bounds (seconds) while waiting for a Message Batch to finish
+BATCH_POLL_INITIAL_INTERVAL = 1.0
+BATCH_POLL_MAX_INTERVAL = 60.0
+
+# Retry policy for transient API failures (rate limits, overload, 5xx)
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504, 529})
+RETRY_INITIAL_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+
+# Suggested models per task tier for tier_models; tiers not listed use the
+# agent's model
+DEFAULT_TIER_MODELS = {
+    "fast": "claude-3-5-haiku-20241022",
+}
+
+# Role descriptions appended to the base system prompt, per agent type
+SYSTEM_PROMPT_BASE = "You are a highly capable AI assistant specialized in "
+TYPE_PROMPTS = {
+    AgentType.CODING: "writing high-quality, well-structured code. You follow best practices, write clean code, and ensure maintainability.",
+    AgentType.TESTING: "creating comprehensive test suites. You write thorough unit tests, integration tests, and ensure high code coverage.",
+    AgentType.DOCUMENTATION: "creating clear, comprehensive documentation. You write detailed API docs, README files, and user guides.",
+    AgentType.REVIEW: "reviewing and validating outputs. You check for errors, constraint violations, and ensure quality standards are met.",
+    AgentType.GENERAL: "solving complex problems across various domains. You are versatile and can handle diverse tasks effectively.",
+}
+
+# One client per API key, shared by every ClaudeAgent so all agent types
+# reuse the same HTTP connection pool
+_shared_clients: Dict[str, AsyncAnthropic] = {}
+
+
+def _get_client(api_key: str) -> AsyncAnthropic:
+    """Get the shared Anthropic client for an API key."""
+    client = _shared_clients.get(api_key)
+    
+    if client is None:
+        # Retries are handled by ClaudeAgent so they are counted and logged
+        client = AsyncAnthropic(api_key=api_key, max_retries=0)
+        _shared_clients[api_key] = client
+    
+    return client
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Check whether an API error is transient."""
+    if isinstance(error, APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES
+    
+    # Timeouts and dropped connections
+    return isinstance(error, APIConnectionError)
+
+
+def _retry_delay(attempt: int) -> float:
+    """Exponential backoff with jitter for the given retry attempt (1-based)."""
+    return min(RETRY_MAX_DELAY, RETRY_INITIAL_DELAY * 2.0 ** (attempt - 1)) + random.uniform(0, 1)
+
+
+async def close_shared_clients() -> None:
+    """Close all shared Anthropic clients and their connection pools."""
+    clients = list(_shared_clients.values())
+    _shared_clients.clear()
+    
+    for client in clients:
+        await client.close()
+
+
+# Successful responses keyed by prompt, shared by all agents
+_response_cache = LRUCache(maxsize=1024)
 
 
 class ClaudeAgent(Agent):
@@ -15,110 +92,318 @@ class ClaudeAgent(Agent):
     def __init__(
         self,
         agent_type: AgentType = AgentType.GENERAL,
-        capabilities: Optional[List[AgentCapability]] = None,
+        capabilities: Optional[Iterable[AgentCapability]] = None,
         model: str = "claude-3-5-sonnet-20241022",
         api_key: Optional[str] = None,
-        min_request_interval: float = 1.0
+        min_request_interval: float = 1.0,
+        use_batch_api: bool = False,
+        cache_enabled: bool = True,
+        tier_models: Optional[Dict[str, str]] = None,
+        max_retries: int = 4
     ):
         """
         Initialize Claude agent.
         
         Args:
             agent_type: Type of agent
-            capabilities: List of capabilities (defaults to all)
+            capabilities: Capabilities (defaults to all)
             model: Claude model to use
             api_key: Anthropic API key (defaults to env var)
             min_request_interval: Minimum seconds between API calls (rate limiting)
+            use_batch_api: Submit execute_many() workloads through the Message
+                Batches API (cheaper, but results are not interactive)
+            cache_enabled: Reuse responses to identical prompts instead of
+                calling the API again
+            tier_models: Model per task tier ("fast", "mid", "frontier"),
+                e.g. DEFAULT_TIER_MODELS; None always uses model
+            max_retries: Retries for transient API errors (429, 529, 5xx,
+                timeouts) before giving up
         """
         if capabilities is None:
-            capabilities = list(AgentCapability)
+            capabilities = ALL_CAPABILITIES
         
         super().__init__(agent_type, capabilities)
         
         self.model = model
         self.api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
         self.min_request_interval = min_request_interval
+        self.use_batch_api = use_batch_api
+        self.cache_enabled = cache_enabled
+        self.tier_models = tier_models or {}
+        self.max_retries = max_retries
         self._last_request_time = 0.0
+        self._rate_limit_lock = asyncio.Lock()
+        
+        # The type-specific part of the system prompt never changes
+        self._system_prefix = SYSTEM_PROMPT_BASE + TYPE_PROMPTS.get(
+            agent_type, TYPE_PROMPTS[AgentType.GENERAL]
+        )
         
         if not self.api_key:
             raise ValueError("ANTHROPIC_API_KEY environment variable not set")
         
-        self.client = AsyncAnthropic(api_key=self.api_key)
+        self.client = _get_client(self.api_key)
     
-    async def execute(self, task: AgentTask) -> AgentOutput:
+    async def execute(
+        self,
+        task: AgentTask,
+        on_delta: Optional[Callable[[str], bool]] = None
+    ) -> AgentOutput:
         """
         Execute a task using Claude.
         
+        The response is streamed; on_delta sees each text chunk as it
+        arrives and can stop generation early (e.g. on a constraint
+        violation) so the remaining tokens are not generated or billed.
+        
         Args:
             task: The task to execute
+            on_delta: Called with each text chunk; return True to abort
             
         Returns:
-            Agent output
+            Agent output (metadata["aborted"] is True if on_delta stopped it)
         """
-        import asyncio
-        import time
+        retries = 0
         
         try:
-            # Rate limiting: ensure minimum time between requests
-            current_time = time.time()
-            time_since_last_request = current_time - self._last_request_time
-            
-            if time_since_last_request < self.min_request_interval:
-                wait_time = self.min_request_interval - time_since_last_request
-                await asyncio.sleep(wait_time)
+            params = self._build_request_params(task)
             
-            # Update last request time
-            self._last_request_time = time.time()
+            # Identical prompts get identical answers; refinement iterations
+            # (with feedback) always go to the API
+            cache_key = None
+            if self.cache_enabled and not task.feedback:
+                cache_key = prompt_key(
+                    params["model"], params["system"], params["messages"][0]["content"]
+                )
+                cached: Optional[AgentOutput] = _response_cache.get(cache_key)
+                if cached is not None:
+                    if on_delta is not None:
+                        on_delta(cached.output)
+                    return replace(
+                        cached,
+                        task_id=task.id,
+                        metadata={
+                            **cached.metadata,
+                            "iteration": task.iteration,
+                            "retries": 0,
+                            "cached": True,
+                        }
+                    )
             
-            # Build system prompt based on agent type
-            system_prompt = self._build_system_prompt(task)
+            while True:
+                await self._wait_for_rate_limit()
+                
+                streamed = False
+                aborted = False
+                try:
+                    # Call Claude API, processing text while it streams in
+                    async with self.client.messages.stream(**params) as stream:
+                        async for text in stream.text_stream:
+                            streamed = True
+                            if on_delta is not None and on_delta(text):
+                                aborted = True
+                                break
+                        
+                        if aborted:
+                            response = stream.current_message_snapshot
+                        else:
+                            response = await stream.get_final_message()
+                    break
+                except Exception as e:
+                    # Chunks already handed to on_delta cannot be taken back
+                    if streamed or retries >= self.max_retries or not _is_retryable(e):
+                        raise
+                    
+                    retries += 1
+                    await asyncio.sleep(_retry_delay(retries))
             
-            # Build user prompt with task and context
-            user_prompt = self._build_user_prompt(task)
+            output = self._build_output(task, response)
+            output.metadata["retries"] = retries
+            output.metadata["aborted"] = aborted
+            if cache_key is not None and not aborted:
+                _response_cache.put(cache_key, output)
             
-            # Call Claude API
-            response = await self.client.messages.create(
-                model=self.model,
-                max_tokens=4096,
-                system=system_prompt,
-                messages=[
-                    {"role": "user", "content": user_prompt}
-                ]
-            )
+            return output
+        
+        except Exception as e:
+            output = self._build_error_output(task, str(e))
+            output.metadata["retries"] = retries
+            return output
+    
+    async def execute_streaming(
+        self,
+        task: AgentTask,
+        on_delta: Callable[[str], bool]
+    ) -> AgentOutput:
+        """Execute a task, streaming response text to on_delta as it arrives."""
+        return await self.execute(task, on_delta=on_delta)
+    
+    async def execute_many(self, tasks: List[AgentTask]) -> List[AgentOutput]:
+        """
+        Execute several tasks, using the Message Batches API when enabled.
+        
+        Batched requests are billed at a discount but may take a while to
+        complete, so this path is only taken for non-interactive workloads
+        (use_batch_api=True) with more than one queued task.
+        
+        Args:
+            tasks: The tasks to execute
             
-            # Extract text content
-            output_text = ""
-            for block in response.content:
-                if hasattr(block, "text"):
-                    output_text += block.text
+        Returns:
+            Agent outputs in the same order as the tasks
+        """
+        if not self.use_batch_api or len(tasks) <= 1:
+            return await super().execute_many(tasks)
+        
+        try:
+            await self._wait_for_rate_limit()
             
-            return AgentOutput(
-                task_id=task.id,
-                success=True,
-                output=output_text,
-                metadata={
-                    "model": self.model,
-                    "agent_type": self.agent_type.value,
-                    "iteration": task.iteration,
-                    "usage": {
-                        "input_tokens": response.usage.input_tokens,
-                        "output_tokens": response.usage.output_tokens,
-                    }
+            # custom_id must be short and unique, so key requests by position
+            requests: List[Request] = [
+                {
+                    "custom_id": f"task-{i}",
+                    "params": cast(MessageCreateParamsNonStreaming, self._build_request_params(task)),
                 }
+                for i, task in enumerate(tasks)
+            ]
+            batch = await self._call_with_retries(
+                lambda: self.client.messages.batches.create(requests=requests)
             )
+            batch_id = batch.id
+            
+            # Poll with exponential backoff until processing has ended
+            poll_interval = BATCH_POLL_INITIAL_INTERVAL
+            while batch.processing_status != "ended":
+                await asyncio.sleep(poll_interval)
+                poll_interval = min(poll_interval * 2, BATCH_POLL_MAX_INTERVAL)
+                batch = await self._call_with_retries(
+                    lambda: self.client.messages.batches.retrieve(batch_id)
+                )
+            
+            async def _fetch_results() -> List[Any]:
+                return [entry async for entry in await self.client.messages.batches.results(batch_id)]
+            
+            outputs: List[Optional[AgentOutput]] = [None] * len(tasks)
+            for entry in await self._call_with_retries(_fetch_results):
+                index = int(entry.custom_id.split("-", 1)[1])
+                task = tasks[index]
+                
+                if entry.result.type == "succeeded":
+                    outputs[index] = self._build_output(task, entry.result.message)
+                else:
+                    error = getattr(entry.result, "error", None)
+                    outputs[index] = self._build_error_output(
+                        task,
+                        f"Batch request {entry.result.type}" + (f": {error}" if error else "")
+                    )
+            
+            return [
+                output or self._build_error_output(task, "Missing result in message batch")
+                for task, output in zip(tasks, outputs)
+            ]
         
         except Exception as e:
-            return AgentOutput(
-                task_id=task.id,
-                success=False,
-                output=None,
-                metadata={
-                    "model": self.model,
-                    "agent_type": self.agent_type.value,
-                    "iteration": task.iteration,
-                },
-                error=str(e)
-            )
+            return [self._build_error_output(task, str(e)) for task in tasks]
+    
+    async def _call_with_retries(self, request: Callable[[], Awaitable[T]]) -> T:
+        """
+        Make an API call, retrying transient errors with backoff.
+        
+        The shared client has SDK retries disabled, so every endpoint
+        goes through this (or the equivalent loop in execute()).
+        
+        Args:
+            request: Starts the API call; called again for each retry
+        
+        Returns:
+            The call's result
+        """
+        retries = 0
+        
+        while True:
+            try:
+                return await request()
+            except Exception as e:
+                if retries >= self.max_retries or not _is_retryable(e):
+                    raise
+                
+                retries += 1
+                await asyncio.sleep(_retry_delay(retries))
+    
+    @property
+    def supports_batching(self) -> bool:
+        """Whether execute_many() goes through the Message Batches API."""
+        return self.use_batch_api
+    
+    async def _wait_for_rate_limit(self) -> None:
+        """
+        Ensure minimum time between requests.
+        
+        The lock spaces out concurrent callers too, so agents shared by
+        parallel executions still respect min_request_interval.
+        """
+        async with self._rate_limit_lock:
+            current_time = time.time()
+            time_since_last_request = current_time - self._last_request_time
+            
+            if time_since_last_request < self.min_request_interval:
+                wait_time = self.min_request_interval - time_since_last_request
+                await asyncio.sleep(wait_time)
+            
+            # Update last request time
+            self._last_request_time = time.time()
+    
+    def _model_for_task(self, task: AgentTask) -> str:
+        """Pick the model for a task based on its tier."""
+        return self.tier_models.get(classify_task_tier(task), self.model)
+    
+    def _build_request_params(self, task: AgentTask) -> Dict[str, Any]:
+        """Build the Messages API parameters for a task."""
+        return {
+            "model": self._model_for_task(task),
+            "max_tokens": 4096,
+            # System prompt based on agent type, user prompt with task and context
+            "system": self._build_system_prompt(task),
+            "messages": [
+                {"role": "user", "content": self._build_user_prompt(task)}
+            ],
+        }
+    
+    def _build_output(self, task: AgentTask, response: Any) -> AgentOutput:
+        """Convert a Messages API response into agent output."""
+        # Extract text content
+        output_text = "".join(
+            block.text for block in response.content if hasattr(block, "text")
+        )
+        
+        return AgentOutput(
+            task_id=task.id,
+            success=True,
+            output=output_text,
+            metadata={
+                "model": self._model_for_task(task),
+                "agent_type": self.agent_type.value,
+                "iteration": task.iteration,
+                "usage": {
+                    "input_tokens": response.usage.input_tokens,
+                    "output_tokens": response.usage.output_tokens,
+                }
+            }
+        )
+    
+    def _build_error_output(self, task: AgentTask, error: str) -> AgentOutput:
+        """Build a failed agent output."""
+        return AgentOutput(
+            task_id=task.id,
+            success=False,
+            output=None,
+            metadata={
+                "model": self._model_for_task(task),
+                "agent_type": self.agent_type.value,
+                "iteration": task.iteration,
+            },
+            error=error
+        )
     
     async def validate_capability(self, capability: AgentCapability) -> bool:
         """Check if agent has a capability."""
@@ -126,43 +411,31 @@ class ClaudeAgent(Agent):
     
     def _build_system_prompt(self, task: AgentTask) -> str:
         """Build system prompt based on agent type."""
-        base_prompt = "You are a highly capable AI assistant specialized in "
-        
-        type_prompts = {
-            AgentType.CODING: "writing high-quality, well-structured code. You follow best practices, write clean code, and ensure maintainability.",
-            AgentType.TESTING: "creating comprehensive test suites. You write thorough unit tests, integration tests, and ensure high code coverage.",
-            AgentType.DOCUMENTATION: "creating clear, comprehensive documentation. You write detailed API docs, README files, and user guides.",
-            AgentType.REVIEW: "reviewing and validating outputs. You check for errors, constraint violations, and ensure quality standards are met.",
-            AgentType.GENERAL: "solving complex problems across various domains. You are versatile and can handle diverse tasks effectively.",
-        }
-        
-        prompt = base_prompt + type_prompts.get(self.agent_type, type_prompts[AgentType.GENERAL])
+        parts = [self._system_prefix]
         
         # Add constraint awareness
         if task.constraints:
-            prompt += "\n\nIMPORTANT: You must strictly adhere to the following constraints:\n"
-            for i, constraint in enumerate(task.constraints, 1):
-                prompt += f"{i}. {constraint}\n"
+            parts.append("\n\nIMPORTANT: You must strictly adhere to the following constraints:\n")
+            parts.extend(f"{i}. {constraint}\n" for i, constraint in enumerate(task.constraints, 1))
         
         # Add feedback if this is a refinement iteration
         if task.feedback:
-            prompt += f"\n\nFEEDBACK FROM PREVIOUS ITERATION:\n{task.feedback}\n"
-            prompt += "Please address all feedback and ensure all constraints are met in this iteration."
+            parts.append(f"\n\nFEEDBACK FROM PREVIOUS ITERATION:\n{task.feedback}\n")
+            parts.append("Please address all feedback and ensure all constraints are met in this iteration.")
         
-        return prompt
+        return "".join(parts)
     
     def _build_user_prompt(self, task: AgentTask) -> str:
         """Build user prompt with task details."""
-        prompt = f"TASK:\n{task.description}\n"
+        parts = [f"TASK:\n{task.description}\n"]
         
         if task.context:
-            prompt += "\n\nCONTEXT:\n"
-            for key, value in task.context.items():
-                prompt += f"- {key}: {value}\n"
+            parts.append("\n\nCONTEXT:\n")
+            parts.extend(f"- {key}: {value}\n" for key, value in task.context.items())
         
         if task.iteration > 0:
-            prompt += f"\n\nThis is iteration {task.iteration + 1}. "
-            prompt += "Please refine your previous output based on the feedback provided."
+            parts.append(f"\n\nThis is iteration {task.iteration + 1}. ")
+            parts.append("Please refine your previous output based on the feedback provided.")
         
-        return prompt
+        return "".join(parts)
 
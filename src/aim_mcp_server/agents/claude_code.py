@@ -5,11 +5,31 @@ This agent delegates work back to Claude Code itself, allowing Pro users
 to use AIM without needing separate API access.
 """
 
-from typing import List, Optional
+from typing import Iterable, Optional
 
-from .base import Agent, AgentType, AgentCapability, AgentTask, AgentOutput
+from .base import ALL_CAPABILITIES, Agent, AgentType, AgentCapability, AgentTask, AgentOutput
 
 
+# Specialized role description per agent type
+TYPE_CONTEXT = {
+    AgentType.CODING: "You are a coding specialist. Focus on writing high-quality, well-structured code.",
+    AgentType.TESTING: "You are a testing specialist. Focus on comprehensive test coverage and quality.",
+    AgentType.DOCUMENTATION: "You are a documentation specialist. Create clear, detailed documentation.",
+    AgentType.REVIEW: "You are a code reviewer. Carefully validate the output against requirements.",
+    AgentType.GENERAL: "You are a versatile AI assistant capable of handling various tasks."
+}
+
+# Closing instructions appended to every execution prompt
+EXECUTION_INSTRUCTIONS = """
+**Instructions:**
+1. Read all requirements and constraints carefully
+2. Complete the task exactly as specified
+3. Verify that your output meets ALL constraints
+4. If this is a refinement iteration, address ALL feedback points
+
+Please proceed with the task now.
+"""
+
 class ClaudeCodeAgent(Agent):
     """
     Agent implementation that delegates work back to Claude Code.
@@ -22,21 +42,22 @@ class ClaudeCodeAgent(Agent):
     def __init__(
         self,
         agent_type: AgentType = AgentType.GENERAL,
-        capabilities: Optional[List[AgentCapability]] = None
+        capabilities: Optional[Iterable[AgentCapability]] = None
     ):
         """
         Initialize Claude Code agent.
         
         Args:
             agent_type: Type of agent
-            capabilities: List of capabilities (defaults to all)
+            capabilities: Capabilities (defaults to all)
         """
         if capabilities is None:
-            capabilities = list(AgentCapability)
+            capabilities = ALL_CAPABILITIES
         
         super().__init__(agent_type, capabilities)
         
         self.agent_type = agent_type
+        self._type_context = TYPE_CONTEXT.get(agent_type, TYPE_CONTEXT[AgentType.GENERAL])
     
     async def execute(self, task: AgentTask) -> AgentOutput:
         """
@@ -79,51 +100,32 @@ class ClaudeCodeAgent(Agent):
         This creates a well-structured prompt that Claude Code can follow
         to accomplish the task according to AIM's requirements.
         """
-        # Build specialized prompt based on agent type
-        type_context = {
-            AgentType.CODING: "You are a coding specialist. Focus on writing high-quality, well-structured code.",
-            AgentType.TESTING: "You are a testing specialist. Focus on comprehensive test coverage and quality.",
-            AgentType.DOCUMENTATION: "You are a documentation specialist. Create clear, detailed documentation.",
-            AgentType.REVIEW: "You are a code reviewer. Carefully validate the output against requirements.",
-            AgentType.GENERAL: "You are a versatile AI assistant capable of handling various tasks."
-        }
-        
-        prompt = f"""**AIM Task Execution Request**
+        parts = [f"""**AIM Task Execution Request**
 
-{type_context.get(self.agent_type, type_context[AgentType.GENERAL])}
+{self._type_context}
 
 **Task Description:**
 {task.description}
-"""
+"""]
         
         # Add context if provided
         if task.context:
-            prompt += "\n**Context:**\n"
-            for key, value in task.context.items():
-                prompt += f"- {key}: {value}\n"
+            parts.append("\n**Context:**\n")
+            parts.extend(f"- {key}: {value}\n" for key, value in task.context.items())
         
         # Add constraints
         if task.constraints:
-            prompt += "\n**CRITICAL - You must satisfy ALL of these constraints:**\n"
-            for i, constraint in enumerate(task.constraints, 1):
-                prompt += f"{i}. {constraint}\n"
+            parts.append("\n**CRITICAL - You must satisfy ALL of these constraints:**\n")
+            parts.extend(f"{i}. {constraint}\n" for i, constraint in enumerate(task.constraints, 1))
         
         # Add iteration feedback if this is a refinement
         if task.iteration > 0 and task.feedback:
-            prompt += f"\n**Iteration {task.iteration + 1} - Feedback from previous attempt:**\n"
-            prompt += f"{task.feedback}\n\n"
-            prompt += "Please address ALL the feedback points and ensure ALL constraints are met.\n"
+            parts.append(f"\n**Iteration {task.iteration + 1} - Feedback from previous attempt:**\n")
+            parts.append(f"{task.feedback}\n\n")
+            parts.append("Please address ALL the feedback points and ensure ALL constraints are met.\n")
         
         # Add execution instructions
-        prompt += """
-**Instructions:**
-1. Read all requirements and constraints carefully
-2. Complete the task exactly as specified
-3. Verify that your output meets ALL constraints
-4. If this is a refinement iteration, address ALL feedback points
-
-Please proceed with the task now.
-"""
+        parts.append(EXECUTION_INSTRUCTIONS)
         
-        return prompt
+        return "".join(parts)
 
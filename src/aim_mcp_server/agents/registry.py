@@ -6,10 +6,64 @@ Supports two modes:
 2. Claude Code Mode: Uses ClaudeCodeAgent (for Pro users without API key)
 """
 
-from typing import Dict, List, Optional
-from .base import Agent, AgentType, AgentCapability, AgentTask
-from .claude import ClaudeAgent
-from .claude_code import ClaudeCodeAgent
+import asyncio
+import os
+import re
+import sys
+from functools import lru_cache, partial
+from typing import Callable, Dict, List, Optional, Tuple
+from .base import ALL_CAPABILITIES, Agent, AgentType, AgentCapability, AgentTask, AgentOutput
+
+
+# Capabilities of the default agent pool, the same in both modes
+DEFAULT_AGENT_CAPABILITIES: Dict[AgentType, Tuple[AgentCapability, ...]] = {
+    AgentType.CODING: (AgentCapability.CODE_GENERATION, AgentCapability.REFACTORING),
+    AgentType.TESTING: (AgentCapability.TEST_GENERATION,),
+    AgentType.DOCUMENTATION: (AgentCapability.DOCUMENTATION,),
+    AgentType.REVIEW: (AgentCapability.CODE_REVIEW, AgentCapability.VALIDATION),
+    AgentType.GENERAL: ALL_CAPABILITIES,
+}
+
+# Routing keywords per agent type, in priority order when several match
+ROUTING_KEYWORDS: Dict[AgentType, Tuple[str, ...]] = {
+    AgentType.TESTING: ("test", "coverage"),
+    AgentType.DOCUMENTATION: ("document", "readme", "docs"),
+    AgentType.CODING: ("code", "implement", "refactor", "develop"),
+}
+
+# All keywords compiled into one automaton-style alternation. Group names
+# are AgentType values; the zero-width lookahead reports every occurrence
+# (even keywords nested in longer words), so one scan matches the old
+# per-keyword substring checks.
+ROUTING_PATTERN = re.compile(
+    "(?=" + "|".join(
+        f"(?P<{agent_type.value}>" + "|".join(map(re.escape, keywords)) + ")"
+        for agent_type, keywords in ROUTING_KEYWORDS.items()
+    ) + ")",
+    re.IGNORECASE,
+)
+
+# Agent types tried in order when several keyword groups match
+ROUTING_PRIORITY = tuple(ROUTING_KEYWORDS)
+
+
+@lru_cache(maxsize=1024)
+def route_candidates(description: str) -> Tuple[AgentType, ...]:
+    """
+    Get the agent types whose keywords appear in a description.
+    
+    Refinement re-sends the same descriptions every iteration, so results
+    are memoized. Only agent types are cached, never agent instances, so
+    registering agents doesn't invalidate anything.
+    
+    Args:
+        description: Task description
+    
+    Returns:
+        Matching agent types in priority order
+    """
+    matched = {match.lastgroup for match in ROUTING_PATTERN.finditer(description)}
+    return tuple(agent_type for agent_type in ROUTING_PRIORITY if agent_type.value in matched)
 
 
 class AgentRegistry:
@@ -17,8 +71,13 @@ class AgentRegistry:
     
     def __init__(self):
         """Initialize agent registry."""
+        # Agents created so far; the rest are built by their factory on first use
         self.agents: Dict[AgentType, Agent] = {}
+        self._factories: Dict[AgentType, Callable[[], Agent]] = {}
         self.mode: str = "unknown"  # "api" or "claude_code"
+        # Fallback and review agents, resolved on first use after each change
+        self._default_agent: Optional[Agent] = None
+        self._review_agent: Optional[Agent] = None
         self._initialize_default_agents()
     
     def _initialize_default_agents(self) -> None:
@@ -28,10 +87,10 @@ class AgentRegistry:
         Supports two modes:
         1. API Mode: If ANTHROPIC_API_KEY is set, use ClaudeAgent (autonomous)
         2. Claude Code Mode: If no API key, use ClaudeCodeAgent (delegated)
-        """
-        import os
-        import sys
         
+        Each mode imports only its own agent module, so delegation mode never
+        loads the anthropic SDK. Agents themselves are created on first use.
+        """
         has_api_key = bool(os.getenv("ANTHROPIC_API_KEY"))
         
         if has_api_key:
@@ -40,45 +99,15 @@ class AgentRegistry:
             self.mode = "api"
             
             try:
-                # Create specialized agents with API access
-                self.agents[AgentType.CODING] = ClaudeAgent(
-                    agent_type=AgentType.CODING,
-                    capabilities=[
-                        AgentCapability.CODE_GENERATION,
-                        AgentCapability.REFACTORING,
-                    ]
-                )
+                from .claude import ClaudeAgent
                 
-                self.agents[AgentType.TESTING] = ClaudeAgent(
-                    agent_type=AgentType.TESTING,
-                    capabilities=[AgentCapability.TEST_GENERATION]
-                )
+                # Specialized agents with API access
+                self._register_default_factories(ClaudeAgent)
                 
-                self.agents[AgentType.DOCUMENTATION] = ClaudeAgent(
-                    agent_type=AgentType.DOCUMENTATION,
-                    capabilities=[AgentCapability.DOCUMENTATION]
-                )
-                
-                self.agents[AgentType.REVIEW] = ClaudeAgent(
-                    agent_type=AgentType.REVIEW,
-                    capabilities=[
-                        AgentCapability.CODE_REVIEW,
-                        AgentCapability.VALIDATION,
-                    ]
-                )
-                
-                self.agents[AgentType.GENERAL] = ClaudeAgent(
-                    agent_type=AgentType.GENERAL,
-                    capabilities=list(AgentCapability)
-                )
-                
-                print("✓ All API-based agents initialized successfully", file=sys.stderr)
+                print("✓ API-based agents registered (created on first use)", file=sys.stderr)
             
-            except ValueError:
-                # Re-raise ValueError (from API key validation)
-                raise
             except Exception as e:
-                # For other unexpected errors, provide clear error message
+                # For unexpected errors, provide clear error message
                 error_msg = f"Failed to initialize API agents: {e}"
                 print(f"ERROR: {error_msg}", file=sys.stderr)
                 raise RuntimeError(error_msg) from e
@@ -91,39 +120,12 @@ class AgentRegistry:
             self.mode = "claude_code"
             
             try:
-                # Create specialized agents that delegate to Claude Code
-                self.agents[AgentType.CODING] = ClaudeCodeAgent(
-                    agent_type=AgentType.CODING,
-                    capabilities=[
-                        AgentCapability.CODE_GENERATION,
-                        AgentCapability.REFACTORING,
-                    ]
-                )
-                
-                self.agents[AgentType.TESTING] = ClaudeCodeAgent(
-                    agent_type=AgentType.TESTING,
-                    capabilities=[AgentCapability.TEST_GENERATION]
-                )
-                
-                self.agents[AgentType.DOCUMENTATION] = ClaudeCodeAgent(
-                    agent_type=AgentType.DOCUMENTATION,
-                    capabilities=[AgentCapability.DOCUMENTATION]
-                )
-                
-                self.agents[AgentType.REVIEW] = ClaudeCodeAgent(
-                    agent_type=AgentType.REVIEW,
-                    capabilities=[
-                        AgentCapability.CODE_REVIEW,
-                        AgentCapability.VALIDATION,
-                    ]
-                )
+                from .claude_code import ClaudeCodeAgent
                 
-                self.agents[AgentType.GENERAL] = ClaudeCodeAgent(
-                    agent_type=AgentType.GENERAL,
-                    capabilities=list(AgentCapability)
-                )
+                # Specialized agents that delegate to Claude Code
+                self._register_default_factories(ClaudeCodeAgent)
                 
-                print("✓ All Claude Code delegation agents initialized successfully", file=sys.stderr)
+                print("✓ Claude Code delegation agents registered (created on first use)", file=sys.stderr)
             
             except Exception as e:
                 # For unexpected errors
@@ -131,6 +133,13 @@ class AgentRegistry:
                 print(f"ERROR: {error_msg}", file=sys.stderr)
                 raise RuntimeError(error_msg) from e
     
+    def _register_default_factories(self, agent_class: Callable[..., Agent]) -> None:
+        """Register a factory per default agent type for the given agent class."""
+        for agent_type, capabilities in DEFAULT_AGENT_CAPABILITIES.items():
+            self._factories[agent_type] = partial(
+                agent_class, agent_type=agent_type, capabilities=capabilities
+            )
+    
     def register_agent(self, agent_type: AgentType, agent: Agent) -> None:
         """
         Register a new agent.
@@ -140,6 +149,8 @@ class AgentRegistry:
             agent: The agent instance
         """
         self.agents[agent_type] = agent
+        self._default_agent = None
+        self._review_agent = None
     
     def get_agent(self, agent_type: AgentType) -> Optional[Agent]:
         """
@@ -151,7 +162,14 @@ class AgentRegistry:
         Returns:
             The agent instance or None
         """
-        return self.agents.get(agent_type)
+        agent = self.agents.get(agent_type)
+        
+        if agent is None:
+            factory = self._factories.get(agent_type)
+            if factory is not None:
+                agent = self.agents[agent_type] = factory()
+        
+        return agent
     
     def get_agent_for_task(self, task: AgentTask) -> Agent:
         """
@@ -164,31 +182,88 @@ class AgentRegistry:
             The most suitable agent
         """
         # Simple routing logic based on keywords in task description
-        description_lower = task.description.lower()
-        
-        if any(word in description_lower for word in ["test", "testing", "unit test", "coverage"]):
-            agent = self.agents.get(AgentType.TESTING)
+        for agent_type in route_candidates(task.description):
+            agent = self.get_agent(agent_type)
+            # can_handle() depends on the whole task, so it is never cached
             if agent and agent.can_handle(task):
                 return agent
         
-        if any(word in description_lower for word in ["document", "documentation", "readme", "docs"]):
-            agent = self.agents.get(AgentType.DOCUMENTATION)
-            if agent and agent.can_handle(task):
-                return agent
+        # Default to general agent
+        if self._default_agent is None:
+            self._default_agent = self.get_agent(AgentType.GENERAL) or next(
+                (self.get_agent(agent_type) for agent_type in self.list_agents()), None
+            )
+        return self._default_agent
+    
+    async def execute_many(self, tasks: List[AgentTask]) -> List[AgentOutput]:
+        """
+        Route tasks to agents and execute them in bulk.
         
-        if any(word in description_lower for word in ["code", "implement", "refactor", "develop"]):
-            agent = self.agents.get(AgentType.CODING)
-            if agent and agent.can_handle(task):
-                return agent
+        Tasks are grouped by the agent that will handle them so each agent
+        receives a single execute_many() call (e.g. one Message Batch).
         
-        # Default to general agent
-        return self.agents.get(AgentType.GENERAL, list(self.agents.values())[0])
+        Args:
+            tasks: The tasks to execute
+        
+        Returns:
+            Agent outputs in the same order as the tasks
+        """
+        groups: Dict[int, Tuple[Agent, List[int]]] = {}
+        for index, task in enumerate(tasks):
+            agent = self.get_agent_for_task(task)
+            groups.setdefault(id(agent), (agent, []))[1].append(index)
+        
+        group_outputs = await asyncio.gather(*[
+            agent.execute_many([tasks[i] for i in indices])
+            for agent, indices in groups.values()
+        ])
+        
+        outputs: Dict[int, AgentOutput] = {}
+        for (_, indices), results in zip(groups.values(), group_outputs):
+            for index, output in zip(indices, results):
+                outputs[index] = output
+        
+        return [outputs[index] for index in range(len(tasks))]
+    
+    async def execute_parallel(
+        self,
+        tasks: List[AgentTask],
+        max_concurrency: int = 10
+    ) -> List[AgentOutput]:
+        """
+        Route and execute tasks concurrently.
+        
+        At most max_concurrency requests are in flight at once; each agent's
+        own rate limiting still applies on top of this bound.
+        
+        Args:
+            tasks: The tasks to execute
+            max_concurrency: Maximum number of concurrent executions
+        
+        Returns:
+            Agent outputs in the same order as the tasks
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def _bounded(task: AgentTask) -> AgentOutput:
+            async with semaphore:
+                return await self.get_agent_for_task(task).execute(task)
+        
+        return list(await asyncio.gather(*[_bounded(task) for task in tasks]))
+    
+    def get_review_agent(self) -> Optional[Agent]:
+        """Get the review agent (None if neither a review nor a general agent exists)."""
+        if self._review_agent is None:
+            self._review_agent = self.get_agent(AgentType.REVIEW) or self.get_agent(AgentType.GENERAL)
+        return self._review_agent
     
-    def get_review_agent(self) -> Agent:
-        """Get the review agent."""
-        return self.agents.get(AgentType.REVIEW, self.agents.get(AgentType.GENERAL))
+    async def close(self) -> None:
+        """Release shared resources (e.g. API connection pools) at shutdown."""
+        if self.mode == "api":
+            from .claude import close_shared_clients
+            await close_shared_clients()
     
     def list_agents(self) -> List[AgentType]:
-        """List all registered agent types."""
-        return list(self.agents.keys())
+        """List all registered agent types, including ones not created yet."""
+        return list(dict.fromkeys([*self._factories, *self.agents]))
 
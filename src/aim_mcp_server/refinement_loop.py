@@ -2,10 +2,12 @@
 Iterative refinement loop for ensuring exact user requirements.
 """
 
+import asyncio
 from dataclasses import dataclass
 from typing import Any, List, Optional
 
 from .agents.base import AgentTask, Agent
+from .agents.batching import BatchDispatcher
 from .agents.registry import AgentRegistry
 from .review import ReviewSystem, ValidationResult
 from .storage import TaskStatus
@@ -14,7 +16,7 @@ from .utils.constraints import Constraint
 from .utils.logging import AuditLogger
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RefinementIteration:
     """Represents a single iteration in the refinement loop."""
     iteration: int
@@ -23,7 +25,7 @@ class RefinementIteration:
     agent_metadata: dict
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RefinementResult:
     """Result of the complete refinement process."""
     success: bool
@@ -41,7 +43,10 @@ class RefinementLoop:
         agent_registry: Optional[AgentRegistry] = None,
         review_system: Optional[ReviewSystem] = None,
         audit_logger: Optional[AuditLogger] = None,
-        max_iterations: int = 10
+        max_iterations: int = 10,
+        dispatcher: Optional[BatchDispatcher] = None,
+        stagnation_limit: Optional[int] = None,
+        fail_fast: bool = False
     ):
         """
         Initialize refinement loop.
@@ -51,11 +56,20 @@ class RefinementLoop:
             review_system: Review system
             audit_logger: Audit logger
             max_iterations: Maximum refinement iterations
+            dispatcher: Batches agent calls from concurrent refinements
+                (agents without batch support are called directly)
+            stagnation_limit: Stop after this many consecutive iterations
+                without a new best score (None to always use max_iterations)
+            fail_fast: In the last two iterations, skip the review of output
+                that already fails its constraints (such output scores 0.0)
         """
         self.agent_registry = agent_registry or AgentRegistry()
         self.review_system = review_system or ReviewSystem(self.agent_registry)
         self.audit_logger = audit_logger or AuditLogger()
         self.max_iterations = max_iterations
+        self.dispatcher = dispatcher
+        self.stagnation_limit = stagnation_limit
+        self.fail_fast = fail_fast
     
     async def refine_until_perfect(
         self,
@@ -63,7 +77,8 @@ class RefinementLoop:
         constraints: List[Constraint],
         agent: Optional[Agent] = None,
         context: Optional[dict] = None,
-        task_id: Optional[str] = None
+        task_id: Optional[str] = None,
+        keep_history: bool = True
     ) -> RefinementResult:
         """
         Iteratively refine output until all constraints are met.
@@ -74,6 +89,9 @@ class RefinementLoop:
             agent: Agent to use (auto-selected if None)
             context: Additional context
             task_id: Task ID for logging
+            keep_history: Keep a record of every iteration; if False only
+                the latest one is kept, so memory doesn't grow with
+                max_iterations
             
         Returns:
             Refinement result with final output and history
@@ -81,15 +99,22 @@ class RefinementLoop:
         iterations = []
         current_output = None
         current_feedback = None
+        previous_score: Optional[float] = None
+        best_score = float("-inf")
+        stagnation = 0
+        total_iterations = self.max_iterations
+        
+        # Only id, iteration and feedback change between iterations, so one
+        # task object is reused (each execution is awaited before the next)
+        agent_task = AgentTask(
+            id=task_id or "auto",
+            description=task_description,
+            context=context or {},
+            constraints=constraints
+        )
         
         # Auto-select agent if not provided
         if agent is None:
-            agent_task = AgentTask(
-                id=task_id or "auto",
-                description=task_description,
-                context=context or {},
-                constraints=constraints
-            )
             agent = self.agent_registry.get_agent_for_task(agent_task)
         
         for iteration in range(self.max_iterations):
@@ -101,18 +126,16 @@ class RefinementLoop:
                     data={"iteration": iteration}
                 )
             
-            # Create agent task
-            agent_task = AgentTask(
-                id=f"{task_id or 'task'}_{iteration}",
-                description=task_description,
-                context=context or {},
-                constraints=constraints,
-                iteration=iteration,
-                feedback=current_feedback
-            )
+            # Update agent task for this iteration
+            agent_task.id = f"{task_id or 'task'}_{iteration}"
+            agent_task.iteration = iteration
+            agent_task.feedback = current_feedback
             
             # Execute task
-            agent_output = await agent.execute(agent_task)
+            if self.dispatcher:
+                agent_output = await self.dispatcher.execute(agent, agent_task)
+            else:
+                agent_output = await agent.execute(agent_task)
             
             if not agent_output.success:
                 # Agent execution failed
@@ -142,7 +165,10 @@ class RefinementLoop:
                 output=current_output,
                 constraints=constraints,
                 task_description=task_description,
-                iteration=iteration
+                iteration=iteration,
+                # Near the end of the budget, don't pay for a review of
+                # output that already fails its constraints
+                fail_fast=self.fail_fast and iteration >= self.max_iterations - 2
             )
             
             # Record iteration
@@ -152,6 +178,8 @@ class RefinementLoop:
                 validation=validation,
                 agent_metadata=agent_output.metadata
             )
+            if not keep_history:
+                iterations.clear()
             iterations.append(iteration_record)
             
             # Log iteration result
@@ -181,25 +209,35 @@ class RefinementLoop:
             current_feedback = validation.feedback
             
             # Check if making progress (score improving)
-            if iteration > 0:
-                previous_score = iterations[iteration - 1].validation.score
-                
+            if previous_score is not None:
                 # Only warn if score significantly decreased (not just equal or slightly lower)
                 if validation.score < previous_score * 0.95:  # 5% worse
                     current_feedback += "\n\nWARNING: Quality decreased from previous iteration. Please try a different approach."
                 elif validation.score == previous_score and iteration > 1:
                     # Same score for 2+ iterations - suggest trying something different
                     current_feedback += "\n\nNOTE: Score unchanged. Consider a different approach to address remaining issues."
+            
+            previous_score = validation.score
+            
+            if validation.score > best_score:
+                best_score = validation.score
+                stagnation = 0
+            else:
+                stagnation += 1
+                if self.stagnation_limit is not None and stagnation >= self.stagnation_limit:
+                    # Further iterations are unlikely to help
+                    total_iterations = iteration + 1
+                    break
         
-        # Max iterations reached without perfection
-        final_score = iterations[-1].validation.score if iterations else 0.0
+        # Max iterations (or stagnation limit) reached without perfection
+        final_score = previous_score if previous_score is not None else 0.0
         
         if task_id:
             self.audit_logger.log_event(
                 task_id=task_id,
                 event_type="refinement_max_iterations_reached",
                 data={
-                    "total_iterations": self.max_iterations,
+                    "total_iterations": total_iterations,
                     "final_score": final_score,
                     "perfect_match": False
                 }
@@ -209,7 +247,7 @@ class RefinementLoop:
             success=False,  # Didn't achieve perfection
             final_output=current_output,
             iterations=iterations,
-            total_iterations=self.max_iterations,
+            total_iterations=total_iterations,
             final_score=final_score
         )
     
@@ -230,35 +268,32 @@ class RefinementLoop:
         Returns:
             True if subtask completed successfully
         """
-        task = task_manager.get_task(task_id)
+        task = await task_manager.get_task_async(task_id)
         
         if not task:
             return False
         
         # Find subtask
-        subtask = None
-        for st in task.subtasks:
-            if st.id == subtask_id:
-                subtask = st
-                break
+        subtask = task.subtasks_by_id.get(subtask_id)
         
         if not subtask:
             return False
         
         # Update status to in progress
-        task_manager.update_subtask(task_id, subtask_id, TaskStatus.IN_PROGRESS)
+        await task_manager.update_subtask_async(task_id, subtask_id, TaskStatus.IN_PROGRESS)
         
         # Execute with refinement
         result = await self.refine_until_perfect(
             task_description=subtask.description,
             constraints=task.constraints,
             context=task.context,
-            task_id=f"{task_id}_{subtask_id}"
+            task_id=f"{task_id}_{subtask_id}",
+            keep_history=False
         )
         
         # Update subtask with result
         if result.success or result.final_score >= 0.8:  # Accept if good enough
-            task_manager.update_subtask(
+            await task_manager.update_subtask_async(
                 task_id,
                 subtask_id,
                 TaskStatus.COMPLETED,
@@ -266,11 +301,41 @@ class RefinementLoop:
             )
             return True
         else:
-            task_manager.update_subtask(
+            await task_manager.update_subtask_async(
                 task_id,
                 subtask_id,
                 TaskStatus.FAILED,
                 result.final_output
             )
             return False
+    
+    async def refine_subtasks(
+        self,
+        task_manager: TaskManager,
+        task_id: str,
+        subtask_ids: List[str],
+        max_concurrency: int = 8
+    ) -> List[bool]:
+        """
+        Execute and refine several independent subtasks concurrently.
+        
+        The caller is responsible for only passing subtasks whose
+        dependencies have already completed.
+        
+        Args:
+            task_manager: Task manager instance
+            task_id: Parent task ID
+            subtask_ids: Subtasks to execute
+            max_concurrency: Maximum number of subtasks refined at once
+        
+        Returns:
+            Success flag per subtask, in the same order as subtask_ids
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def _bounded(subtask_id: str) -> bool:
+            async with semaphore:
+                return await self.refine_subtask(task_manager, task_id, subtask_id)
+        
+        return list(await asyncio.gather(*[_bounded(sid) for sid in subtask_ids]))
 
@@ -2,15 +2,54 @@
 Review and validation system.
 """
 
+import re
 from dataclasses import dataclass
-from typing import Any, List, Optional
+from typing import Any, List, Optional, Tuple
 
 from .agents.base import AgentTask, AgentOutput, Agent
+from .agents.batching import BatchDispatcher
 from .agents.registry import AgentRegistry
 from .utils.constraints import Constraint, ConstraintParser
 
 
-@dataclass
+# Words marking a line of review output as an issue, and the subset that
+# makes it critical. Like the plain substring checks they replace, these
+# also match inside longer words ("errors", "issues", "mustn't").
+_ISSUE_RE = re.compile(r"error|issue|problem|missing|incorrect", re.IGNORECASE)
+_SEVERITY_RE = re.compile(r"error|critical|must", re.IGNORECASE)
+
+# Verdicts meaning the review found nothing to fix (checked upper-cased)
+PERFECT_MARKERS = ("OUTPUT IS PERFECT", "ALL CONSTRAINTS MET")
+
+
+class PerfectVerdictWatcher:
+    """
+    Streaming callback that stops a review once it declares the output perfect.
+    
+    Any issues listed around that verdict are ignored by the parser anyway,
+    so the rest of the response doesn't need to be generated.
+    """
+    
+    def __init__(self) -> None:
+        """Initialize watcher."""
+        self.found = False
+        # Enough trailing text to catch a marker split across chunks
+        self._tail = ""
+        self._tail_length = max(len(marker) for marker in PERFECT_MARKERS) - 1
+    
+    def __call__(self, text: str) -> bool:
+        """Inspect the next chunk; return True to stop the stream."""
+        window = self._tail + text.upper()
+        
+        if any(marker in window for marker in PERFECT_MARKERS):
+            self.found = True
+            return True
+        
+        self._tail = window[-self._tail_length:]
+        return False
+
+
+@dataclass(frozen=True, slots=True)
 class ValidationIssue:
     """Represents a validation issue found in output."""
     constraint: str
@@ -19,7 +58,7 @@ class ValidationIssue:
     suggestion: Optional[str] = None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ValidationResult:
     """Result of validating output against constraints."""
     perfect_match: bool
@@ -31,21 +70,32 @@ class ValidationResult:
 class ReviewSystem:
     """Manages output review and validation."""
     
-    def __init__(self, agent_registry: Optional[AgentRegistry] = None):
+    def __init__(
+        self,
+        agent_registry: Optional[AgentRegistry] = None,
+        dispatcher: Optional[BatchDispatcher] = None,
+        fail_fast_threshold: int = 1
+    ):
         """
         Initialize review system.
         
         Args:
             agent_registry: Agent registry for accessing review agents
+            dispatcher: Batches review calls from concurrent validations
+            fail_fast_threshold: Critical constraint failures at which a
+                fail-fast validation skips the review
         """
         self.agent_registry = agent_registry or AgentRegistry()
+        self.dispatcher = dispatcher
+        self.fail_fast_threshold = fail_fast_threshold
     
     async def validate_output(
         self,
         output: Any,
         constraints: List[Constraint],
         task_description: str,
-        iteration: int = 0
+        iteration: int = 0,
+        fail_fast: bool = False
     ) -> ValidationResult:
         """
         Validate output against constraints.
@@ -55,66 +105,47 @@ class ReviewSystem:
             constraints: List of constraints to check
             task_description: Original task description
             iteration: Current iteration number
-            
+            fail_fast: Skip the review agent once fail_fast_threshold
+                constraints have failed; the result then scores 0.0
+        
         Returns:
             Validation result with issues and feedback
         """
-        issues = []
-        
-        # Check each constraint
-        for constraint in constraints:
-            is_valid, error = ConstraintParser.validate_constraint(constraint, output)
-            
-            if not is_valid:
-                issues.append(ValidationIssue(
-                    constraint=str(constraint),
-                    severity="critical",
-                    description=error or "Constraint not met",
-                    suggestion=f"Ensure output satisfies: {constraint}"
-                ))
+        # Outputs can be large; convert everything to text only once
+        output_str = str(output)
+        constraint_strs = [str(c) for c in constraints]
         
-        # Use review agent for semantic validation
-        review_agent = self.agent_registry.get_review_agent()
+        # The deterministic checks are a few substring and regex tests; they
+        # cost far less than handing them to a worker thread. All of them
+        # run even with fail_fast, so the feedback lists every failure.
+        issues = self._check_constraints(output, constraints, constraint_strs)
         
-        if review_agent:
-            review_task = AgentTask(
-                id=f"review_{iteration}",
-                description=self._build_review_prompt(
-                    task_description,
-                    output,
-                    constraints
-                ),
-                context={
-                    "task_description": task_description,
-                    "output": str(output),
-                    "iteration": iteration,
-                },
-                constraints=constraints,
-                iteration=iteration
+        # Output that already fails its constraints isn't worth a review call
+        skip_review = fail_fast and len(issues) >= self.fail_fast_threshold
+        if not skip_review:
+            issues += await self._review_issues(
+                output_str, constraints, constraint_strs, task_description, iteration
             )
-            
-            review_output = await review_agent.execute(review_task)
-            
-            if review_output.success:
-                # Parse review agent's output for additional issues
-                additional_issues = self._parse_review_output(review_output.output)
-                issues.extend(additional_issues)
+        
+        # Group by severity once, for both scoring and feedback
+        critical, warnings = self._partition_issues(issues)
         
         # Calculate score based on issues
-        if not issues:
+        if skip_review:
+            # Unreviewed output can't be scored from a partial issue list
+            score = 0.0
+            perfect_match = False
+        elif not issues:
             score = 1.0
             perfect_match = True
         else:
-            critical_issues = sum(1 for i in issues if i.severity == "critical")
-            warning_issues = sum(1 for i in issues if i.severity == "warning")
-            
             # Score calculation: penalize critical more than warnings
-            penalty = (critical_issues * 0.3) + (warning_issues * 0.1)
+            penalty = (len(critical) * 0.3) + (len(warnings) * 0.1)
             score = max(0.0, 1.0 - penalty)
             perfect_match = False
         
         # Generate feedback
-        feedback = self._generate_feedback(issues, constraints, iteration)
+        feedback = self._generate_feedback(issues, critical, warnings, iteration)
         
         return ValidationResult(
             perfect_match=perfect_match,
@@ -123,26 +154,97 @@ class ReviewSystem:
             feedback=feedback
         )
     
+    def _check_constraints(
+        self,
+        output: Any,
+        constraints: List[Constraint],
+        constraint_strs: List[str]
+    ) -> List[ValidationIssue]:
+        """
+        Check output against each constraint.
+        
+        Args:
+            output: The output to validate
+            constraints: Constraints to check
+            constraint_strs: str() of each constraint
+        
+        Returns:
+            Issues for the constraints that failed
+        """
+        issues = []
+        
+        for constraint, constraint_str in zip(constraints, constraint_strs):
+            is_valid, error = ConstraintParser.validate_constraint(constraint, output)
+            
+            if not is_valid:
+                issues.append(ValidationIssue(
+                    constraint=constraint_str,
+                    severity="critical",
+                    description=error or "Constraint not met",
+                    suggestion=f"Ensure output satisfies: {constraint_str}"
+                ))
+        
+        return issues
+    
+    async def _review_issues(
+        self,
+        output_str: str,
+        constraints: List[Constraint],
+        constraint_strs: List[str],
+        task_description: str,
+        iteration: int
+    ) -> List[ValidationIssue]:
+        """Use review agent for semantic validation."""
+        review_agent = self.agent_registry.get_review_agent()
+        
+        if not review_agent:
+            return []
+        
+        review_task = AgentTask(
+            id=f"review_{iteration}",
+            description=self._build_review_prompt(task_description, output_str, constraint_strs),
+            context={
+                "task_description": task_description,
+                "output": output_str,
+                "iteration": iteration,
+            },
+            constraints=constraints,
+            iteration=iteration
+        )
+        
+        watcher = PerfectVerdictWatcher()
+        
+        if self.dispatcher and review_agent.supports_batching:
+            review_output = await self.dispatcher.execute(review_agent, review_task)
+        else:
+            # Stream the review so a "perfect" verdict ends it early
+            review_output = await review_agent.execute_streaming(review_task, watcher)
+        
+        if not review_output.success:
+            return []
+        
+        # Parse review agent's output for additional issues
+        return [] if watcher.found else self._parse_review_output(review_output.output)
+    
     def _build_review_prompt(
         self,
         task_description: str,
-        output: Any,
-        constraints: List[Constraint]
+        output_str: str,
+        constraint_strs: List[str]
     ) -> str:
         """Build prompt for review agent."""
-        prompt = f"""Review the following output for the given task.
+        parts = [f"""Review the following output for the given task.
 
 TASK:
 {task_description}
 
 CONSTRAINTS:
-"""
-        for i, constraint in enumerate(constraints, 1):
-            prompt += f"{i}. {constraint}\n"
+"""]
+        parts.extend(f"{i}. {constraint_str}\n" for i, constraint_str in enumerate(constraint_strs, 1))
         
-        prompt += f"""
+        parts.append(f"""
 OUTPUT TO REVIEW:
-{output}
+{output_str}
 
 Please carefully review the output and identify any issues:
 1. Does it fully satisfy the task requirements?
@@ -152,68 +254,87 @@ Please carefully review the output and identify any issues:
 
 Provide specific, actionable feedback for any issues found.
 If the output is perfect, clearly state "OUTPUT IS PERFECT - ALL CONSTRAINTS MET".
-"""
-        return prompt
+""")
+        return "".join(parts)
     
     def _parse_review_output(self, review_text: str) -> List[ValidationIssue]:
         """Parse review agent output to extract issues."""
         issues = []
         
         # Check if review agent says output is perfect
-        if "OUTPUT IS PERFECT" in review_text.upper() or "ALL CONSTRAINTS MET" in review_text.upper():
+        review_upper = review_text.upper()
+        if any(marker in review_upper for marker in PERFECT_MARKERS):
             return issues
         
-        # Simple parsing - look for common issue indicators
-        lines = review_text.split("\n")
-        for line in lines:
-            line_lower = line.lower()
+        # Simple parsing - one scan for issue indicators, then take the
+        # line each match falls on
+        match = _ISSUE_RE.search(review_text)
+        while match:
+            line_start = review_text.rfind("\n", 0, match.start()) + 1
+            line_end = review_text.find("\n", match.end())
+            if line_end == -1:
+                line_end = len(review_text)
             
-            # Look for error/issue indicators
-            if any(word in line_lower for word in ["error", "issue", "problem", "missing", "incorrect"]):
-                severity = "critical" if any(word in line_lower for word in ["error", "critical", "must"]) else "warning"
-                
-                issues.append(ValidationIssue(
-                    constraint="Quality Review",
-                    severity=severity,
-                    description=line.strip(),
-                    suggestion=None
-                ))
+            severity = "critical" if _SEVERITY_RE.search(review_text, line_start, line_end) else "warning"
+            
+            issues.append(ValidationIssue(
+                constraint="Quality Review",
+                severity=severity,
+                description=review_text[line_start:line_end].strip(),
+                suggestion=None
+            ))
+            
+            # One issue per line
+            match = _ISSUE_RE.search(review_text, line_end)
         
         return issues
     
+    def _partition_issues(
+        self,
+        issues: List[ValidationIssue]
+    ) -> Tuple[List[ValidationIssue], List[ValidationIssue]]:
+        """Split issues into (critical, warnings) in one pass; info issues are dropped."""
+        critical = []
+        warnings = []
+        
+        for issue in issues:
+            if issue.severity == "critical":
+                critical.append(issue)
+            elif issue.severity == "warning":
+                warnings.append(issue)
+        
+        return critical, warnings
+    
     def _generate_feedback(
         self,
         issues: List[ValidationIssue],
-        constraints: List[Constraint],
+        critical: List[ValidationIssue],
+        warnings: List[ValidationIssue],
         iteration: int
     ) -> str:
-        """Generate actionable feedback from issues."""
+        """Generate actionable feedback from issues already grouped by severity."""
         if not issues:
             return "Output meets all requirements and constraints. Excellent work!"
         
-        feedback = f"Iteration {iteration + 1} - Issues Found:\n\n"
-        
-        # Group by severity
-        critical = [i for i in issues if i.severity == "critical"]
-        warnings = [i for i in issues if i.severity == "warning"]
+        parts = [f"Iteration {iteration + 1} - Issues Found:\n\n"]
         
         if critical:
-            feedback += "CRITICAL ISSUES (must fix):\n"
-            for i, issue in enumerate(critical, 1):
-                feedback += f"{i}. {issue.description}\n"
-                if issue.suggestion:
-                    feedback += f"   Suggestion: {issue.suggestion}\n"
-            feedback += "\n"
+            parts.append("CRITICAL ISSUES (must fix):\n")
+            self._append_issue_lines(parts, critical)
         
         if warnings:
-            feedback += "WARNINGS (should fix):\n"
-            for i, issue in enumerate(warnings, 1):
-                feedback += f"{i}. {issue.description}\n"
-                if issue.suggestion:
-                    feedback += f"   Suggestion: {issue.suggestion}\n"
-            feedback += "\n"
+            parts.append("WARNINGS (should fix):\n")
+            self._append_issue_lines(parts, warnings)
         
-        feedback += "Please address these issues in the next iteration."
+        parts.append("Please address these issues in the next iteration.")
         
-        return feedback
+        return "".join(parts)
+    
+    def _append_issue_lines(self, parts: List[str], issues: List[ValidationIssue]) -> None:
+        """Append a numbered issue list (with suggestions) to feedback parts."""
+        for i, issue in enumerate(issues, 1):
+            parts.append(f"{i}. {issue.description}\n")
+            if issue.suggestion:
+                parts.append(f"   Suggestion: {issue.suggestion}\n")
+        parts.append("\n")
 
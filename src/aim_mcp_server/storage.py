@@ -2,12 +2,18 @@
 Storage layer for persisting tasks and state.
 """
 
-import json
-from datetime import datetime
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from enum import Enum
 
+from .utils.serialization import dumps, loads
+
 
 class TaskStatus(Enum):
     """Status of a task or subtask."""
@@ -19,7 +25,13 @@ class TaskStatus(Enum):
 
 
 class Storage:
-    """Manages persistent storage for tasks and state."""
+    """
+    Manages persistent storage for tasks and state.
+    
+    Tasks live in a single SQLite database (WAL mode). Summary fields are
+    stored in their own columns so listing tasks never parses task data.
+    Methods are thread-safe, so they can be called via asyncio.to_thread().
+    """
     
     def __init__(self, storage_dir: Optional[Path] = None):
         """
@@ -33,36 +45,51 @@ class Storage:
         
         self.storage_dir = storage_dir
         self.storage_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Autocommit mode: every statement is its own transaction. The
+        # connection is shared by worker threads, one at a time.
+        self.db_path = self.storage_dir / "tasks.db"
+        self._conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+        self._lock = threading.RLock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                task_id TEXT PRIMARY KEY,
+                status TEXT,
+                description TEXT,
+                created_at TEXT,
+                last_updated_ns INTEGER,
+                blob TEXT NOT NULL
+            )
+            """
+        )
+        # (status, last_updated_ns) lets a filtered listing read matching rows
+        # already in order and stop after `limit` of them
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_status_updated ON tasks (status, last_updated_ns)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_last_updated ON tasks (last_updated_ns)")
+        
+        self._import_legacy_files()
     
-    def save_task(self, task_id: str, task_data: Dict[str, Any]) -> None:
+    def save_task(self, task_id: str, task_data: Dict[str, Any]) -> int:
         """
         Save task data atomically.
         
-        Uses atomic write pattern (write to temp file, then rename) to prevent
-        corruption if process crashes during write.
+        Each save is a single INSERT OR REPLACE, so a crash mid-write leaves
+        the previous version intact.
         
         Args:
             task_id: The task ID
             task_data: Task data to save
-        """
-        task_file = self.storage_dir / f"{task_id}.json"
-        temp_file = self.storage_dir / f".{task_id}.json.tmp"
         
-        # Add metadata
-        task_data["last_updated"] = datetime.utcnow().isoformat()
-        
-        try:
-            # Write to temporary file first
-            with open(temp_file, "w") as f:
-                json.dump(task_data, f, indent=2)
-            
-            # Atomic rename (this is atomic on POSIX systems)
-            temp_file.replace(task_file)
-        except Exception:
-            # Clean up temp file if something went wrong
-            if temp_file.exists():
-                temp_file.unlink()
-            raise
+        Returns:
+            last_updated_ns of the saved version
+        """
+        with self._lock, self._transaction():
+            return self._write_task(task_id, task_data, self.get_version(task_id))
     
     def load_task(self, task_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -74,13 +101,32 @@ class Storage:
         Returns:
             Task data or None if not found
         """
-        task_file = self.storage_dir / f"{task_id}.json"
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT blob FROM tasks WHERE task_id = ?", (task_id,)
+            ).fetchone()
         
-        if not task_file.exists():
+        if row is None:
             return None
         
-        with open(task_file, "r") as f:
-            return json.load(f)
+        return loads(row[0])
+    
+    def get_version(self, task_id: str) -> Optional[int]:
+        """
+        Get the last_updated_ns of a task without loading it.
+        
+        Args:
+            task_id: The task ID
+        
+        Returns:
+            Timestamp of the stored version, or None if not found
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_updated_ns FROM tasks WHERE task_id = ?", (task_id,)
+            ).fetchone()
+        
+        return row[0] if row is not None else None
     
     def list_tasks(
         self,
@@ -88,7 +134,7 @@ class Storage:
         limit: int = 100
     ) -> List[Dict[str, Any]]:
         """
-        List all tasks.
+        List all tasks, most recently updated first.
         
         Args:
             status: Filter by status
@@ -97,29 +143,29 @@ class Storage:
         Returns:
             List of task summaries
         """
-        tasks = []
+        query = "SELECT task_id, description, status, created_at, last_updated_ns FROM tasks"
+        params: List[Any] = []
         
-        for task_file in sorted(
-            self.storage_dir.glob("*.json"),
-            key=lambda p: p.stat().st_mtime,
-            reverse=True
-        )[:limit]:
-            try:
-                with open(task_file, "r") as f:
-                    task_data = json.load(f)
-                    
-                    if status is None or task_data.get("status") == status.value:
-                        tasks.append({
-                            "task_id": task_data.get("task_id"),
-                            "description": task_data.get("description", "")[:100],
-                            "status": task_data.get("status"),
-                            "created_at": task_data.get("created_at"),
-                            "last_updated": task_data.get("last_updated"),
-                        })
-            except Exception:
-                continue
-        
-        return tasks
+        if status is not None:
+            query += " WHERE status = ?"
+            params.append(status.value)
+        
+        query += " ORDER BY last_updated_ns DESC LIMIT ?"
+        params.append(limit)
+        
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        
+        return [
+            {
+                "task_id": task_id,
+                "description": (description or "")[:100],
+                "status": task_status,
+                "created_at": created_at,
+                "last_updated": _format_ns(last_updated_ns),
+            }
+            for task_id, description, task_status, created_at, last_updated_ns in rows
+        ]
     
     def delete_task(self, task_id: str) -> bool:
         """
@@ -131,15 +177,15 @@ class Storage:
         Returns:
             True if deleted, False if not found
         """
-        task_file = self.storage_dir / f"{task_id}.json"
-        
-        if task_file.exists():
-            task_file.unlink()
-            return True
-        
-        return False
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM tasks WHERE task_id = ?", (task_id,))
+            return cursor.rowcount > 0
     
-    def update_task_status(self, task_id: str, status: TaskStatus) -> bool:
+    def update_task_status(
+        self,
+        task_id: str,
+        status: TaskStatus
+    ) -> Optional[Tuple[Optional[int], int]]:
         """
         Update task status.
         
@@ -148,15 +194,172 @@ class Storage:
             status: New status
             
         Returns:
-            True if updated, False if not found
+            last_updated_ns before and after the update, or None if not found
+        """
+        with self._lock, self._transaction():
+            task_data = self.load_task(task_id)
+            
+            if task_data is None:
+                return None
+            
+            task_data["status"] = status.value
+            previous = task_data.get("last_updated_ns")
+            return previous, self._write_task(task_id, task_data, previous)
+    
+    def patch_subtask(
+        self,
+        task_id: str,
+        subtask_id: str,
+        fields: Dict[str, Any]
+    ) -> Optional[Tuple[Optional[int], int]]:
+        """
+        Update fields of one subtask without rebuilding the whole task.
+        
+        Args:
+            task_id: The task ID
+            subtask_id: The subtask ID
+            fields: Subtask keys to set (e.g. status, output)
+        
+        Returns:
+            last_updated_ns before and after the update, or None if the task
+            or subtask was not found
+        """
+        with self._lock, self._transaction():
+            task_data = self.load_task(task_id)
+            
+            if task_data is None:
+                return None
+            
+            for subtask_data in task_data.get("subtasks", []):
+                if subtask_data.get("id") == subtask_id:
+                    subtask_data.update(fields)
+                    previous = task_data.get("last_updated_ns")
+                    return previous, self._write_task(task_id, task_data, previous)
+        
+        return None
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+    
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """
+        Run the enclosed statements as one write transaction.
+        
+        BEGIN IMMEDIATE takes the database write lock up front, so a
+        read-modify-write can't interleave with another process sharing
+        the database. Callers must hold self._lock.
+        """
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+    
+    def _write_task(
+        self,
+        task_id: str,
+        task_data: Dict[str, Any],
+        previous: Optional[int]
+    ) -> int:
+        """
+        Write task data inside a transaction.
+        
+        Args:
+            task_id: The task ID
+            task_data: Task data to save
+            previous: last_updated_ns of the stored version, if any
+        
+        Returns:
+            last_updated_ns of the saved version
         """
-        task_data = self.load_task(task_id)
+        # A wall-clock timestamp keeps listings in update order, but the clock
+        # can step back or repeat within its resolution. Cached copies are
+        # validated by this value, so it must grow with every write.
+        version = time.time_ns()
+        if previous is not None and version <= previous:
+            version = previous + 1
+        task_data["last_updated_ns"] = version
         
-        if task_data is None:
-            return False
+        self._conn.execute(
+            "INSERT OR REPLACE INTO tasks "
+            "(task_id, status, description, created_at, last_updated_ns, blob) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                task_id,
+                task_data.get("status"),
+                task_data.get("description", ""),
+                task_data.get("created_at"),
+                version,
+                dumps(task_data),
+            )
+        )
         
-        task_data["status"] = status.value
-        self.save_task(task_id, task_data)
+        return version
+    
+    def _import_legacy_files(self) -> None:
+        """
+        Import tasks stored as one JSON file each by earlier versions.
+        
+        Imported files are renamed to *.json.imported rather than deleted.
+        Tasks already in the database are left untouched.
+        """
+        rows = []
+        imported = []
         
-        return True
+        # scandir entries carry their stat results, so listing the
+        # directory costs no extra stat call per file
+        with os.scandir(self.storage_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".json") or not entry.is_file():
+                    continue
+                
+                try:
+                    with open(entry.path, "rb") as f:
+                        task_data = loads(f.read())
+                    
+                    # The blob must carry the same version as the column, or
+                    # cached copies of imported tasks never validate
+                    task_data.setdefault("last_updated_ns", entry.stat().st_mtime_ns)
+                    
+                    rows.append((
+                        task_data.get("task_id", entry.name[:-len(".json")]),
+                        task_data.get("status"),
+                        task_data.get("description", ""),
+                        task_data.get("created_at"),
+                        task_data["last_updated_ns"],
+                        dumps(task_data),
+                    ))
+                    imported.append(entry.path)
+                except Exception:
+                    continue
+        
+        if not rows:
+            return
+        
+        # One transaction for the whole import rather than one per file
+        self._conn.execute("BEGIN")
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO tasks "
+            "(task_id, status, description, created_at, last_updated_ns, blob) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        self._conn.execute("COMMIT")
+        
+        for path in imported:
+            os.replace(path, path + ".imported")
+
+
+def _format_ns(timestamp_ns: Optional[int]) -> Optional[str]:
+    """Format a time.time_ns() timestamp as a UTC ISO string."""
+    if timestamp_ns is None:
+        return None
+    
+    # Naive UTC, the same format task timestamps have always used
+    return datetime.fromtimestamp(timestamp_ns / 1e9, timezone.utc).replace(tzinfo=None).isoformat()
 
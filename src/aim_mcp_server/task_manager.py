@@ -2,18 +2,38 @@
 Task manager for orchestrating complex tasks.
 """
 
+import asyncio
+import re
 import uuid
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+from .agents._cache import LRUCache
 from .agents.base import AgentTask, AgentType
 from .agents.registry import AgentRegistry
 from .storage import Storage, TaskStatus
-from .utils.constraints import ConstraintParser, Constraint
+from .utils.constraints import ConstraintParser, Constraint, ConstraintType
 from .utils.logging import AuditLogger
 
 
+# Keywords that add a subtask of each type, in the order subtasks are created
+DECOMPOSITION_KEYWORDS: Dict[AgentType, Tuple[str, ...]] = {
+    AgentType.CODING: ("code", "implement", "refactor", "develop"),
+    AgentType.TESTING: ("test", "coverage"),
+    AgentType.DOCUMENTATION: ("document", "readme", "docs", "api doc"),
+}
+
+# One scan for all keywords; see ROUTING_PATTERN in agents.registry
+DECOMPOSITION_PATTERN = re.compile(
+    "(?=" + "|".join(
+        f"(?P<{agent_type.value}>" + "|".join(map(re.escape, keywords)) + ")"
+        for agent_type, keywords in DECOMPOSITION_KEYWORDS.items()
+    ) + ")",
+    re.IGNORECASE,
+)
+
+
 @dataclass
 class Subtask:
     """Represents a subtask within a larger task."""
@@ -24,6 +44,31 @@ class Subtask:
     output: Optional[Any] = None
     dependencies: List[str] = field(default_factory=list)
     metadata: Dict[str, Any] = field(default_factory=dict)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert subtask to a JSON-serializable dictionary."""
+        return {
+            "id": self.id,
+            "description": self.description,
+            "agent_type": self.agent_type.value,
+            "status": self.status.value,
+            "output": self.output,
+            "dependencies": self.dependencies,
+            "metadata": self.metadata,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Subtask":
+        """Reconstruct a subtask from to_dict() output."""
+        return cls(
+            id=data["id"],
+            description=data["description"],
+            agent_type=AgentType(data["agent_type"]),
+            status=TaskStatus(data["status"]),
+            output=data.get("output"),
+            dependencies=data.get("dependencies", []),
+            metadata=data.get("metadata", {}),
+        )
 
 
 @dataclass
@@ -38,6 +83,55 @@ class Task:
     output: Optional[Any] = None
     context: Dict[str, Any] = field(default_factory=dict)
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # Index over subtasks, built once from the list passed in
+    subtasks_by_id: Dict[str, Subtask] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self) -> None:
+        self.subtasks_by_id = {st.id: st for st in self.subtasks}
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert task to a JSON-serializable dictionary."""
+        return {
+            "task_id": self.task_id,
+            "description": self.description,
+            "constraints": [c.to_dict() for c in self.constraints],
+            "status": self.status.value,
+            "subtasks": [st.to_dict() for st in self.subtasks],
+            "created_at": self.created_at,
+            "output": self.output,
+            "context": self.context,
+            "metadata": self.metadata,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Task":
+        """Reconstruct a task from to_dict() output."""
+        # Deserialize constraints from stored dictionaries
+        constraints = []
+        for c_data in data.get("constraints", []):
+            # Handle both old string format and new dict format for backwards compatibility
+            if isinstance(c_data, str):
+                # Old format: just store as custom constraint
+                constraints.append(Constraint(
+                    type=ConstraintType.CUSTOM,
+                    description=c_data,
+                    required=True
+                ))
+            else:
+                # New format: reconstruct from dictionary
+                constraints.append(Constraint.from_dict(c_data))
+        
+        return cls(
+            task_id=data["task_id"],
+            description=data["description"],
+            constraints=constraints,
+            status=TaskStatus(data["status"]),
+            subtasks=[Subtask.from_dict(st) for st in data.get("subtasks", [])],
+            created_at=data["created_at"],
+            output=data.get("output"),
+            context=data.get("context", {}),
+            metadata=data.get("metadata", {}),
+        )
 
 
 class TaskManager:
@@ -47,7 +141,8 @@ class TaskManager:
         self,
         storage: Optional[Storage] = None,
         audit_logger: Optional[AuditLogger] = None,
-        agent_registry: Optional[AgentRegistry] = None
+        agent_registry: Optional[AgentRegistry] = None,
+        cache_size: int = 256
     ):
         """
         Initialize task manager.
@@ -56,10 +151,15 @@ class TaskManager:
             storage: Storage instance
             audit_logger: Audit logger instance
             agent_registry: Agent registry instance
+            cache_size: Number of recently used tasks kept in memory
         """
         self.storage = storage or Storage()
         self.audit_logger = audit_logger or AuditLogger()
         self.agent_registry = agent_registry or AgentRegistry()
+        # Write-through cache of (last_updated_ns, Task). Entries are checked
+        # against the stored version, so writes by other processes sharing
+        # the database are picked up on the next get_task().
+        self._task_cache = LRUCache(maxsize=cache_size)
     
     def create_task(
         self,
@@ -78,6 +178,32 @@ class TaskManager:
         Returns:
             Created task
         """
+        task = self._new_task(description, context, deadline)
+        self._save_task(task)
+        self._on_task_created(task)
+        
+        return task
+    
+    async def create_task_async(
+        self,
+        description: str,
+        context: Optional[Dict[str, Any]] = None,
+        deadline: Optional[str] = None
+    ) -> Task:
+        """Like create_task(), but writes storage in a worker thread."""
+        task = self._new_task(description, context, deadline)
+        await self.save_task_async(task)
+        self._on_task_created(task)
+        
+        return task
+    
+    def _new_task(
+        self,
+        description: str,
+        context: Optional[Dict[str, Any]],
+        deadline: Optional[str]
+    ) -> Task:
+        """Build a decomposed task without persisting it."""
         task_id = str(uuid.uuid4())
         
         # Parse constraints from description
@@ -98,21 +224,19 @@ class TaskManager:
             metadata={"deadline": deadline} if deadline else {}
         )
         
-        # Persist task
-        self._save_task(task)
-        
-        # Log event
+        return task
+    
+    def _on_task_created(self, task: Task) -> None:
+        """Log creation of a task."""
         self.audit_logger.log_event(
-            task_id=task_id,
+            task_id=task.task_id,
             event_type="task_created",
             data={
-                "description": description,
-                "num_subtasks": len(subtasks),
-                "num_constraints": len(constraints),
+                "description": task.description,
+                "num_subtasks": len(task.subtasks),
+                "num_constraints": len(task.constraints),
             }
         )
-        
-        return task
     
     def _decompose_task(
         self,
@@ -134,10 +258,10 @@ class TaskManager:
         # Simple keyword-based decomposition
         # In production, this would use an LLM for intelligent decomposition
         
-        description_lower = description.lower()
+        matched = {match.lastgroup for match in DECOMPOSITION_PATTERN.finditer(description)}
         
         # Check for coding tasks
-        if any(word in description_lower for word in ["code", "implement", "refactor", "develop"]):
+        if AgentType.CODING.value in matched:
             subtasks.append(Subtask(
                 id=str(uuid.uuid4()),
                 description=f"Implement: {description}",
@@ -145,7 +269,7 @@ class TaskManager:
             ))
         
         # Check for testing tasks
-        if any(word in description_lower for word in ["test", "testing", "unit test", "coverage"]):
+        if AgentType.TESTING.value in matched:
             subtasks.append(Subtask(
                 id=str(uuid.uuid4()),
                 description=f"Create tests for: {description}",
@@ -154,7 +278,7 @@ class TaskManager:
             ))
         
         # Check for documentation tasks
-        if any(word in description_lower for word in ["document", "documentation", "readme", "docs", "api doc"]):
+        if AgentType.DOCUMENTATION.value in matched:
             subtasks.append(Subtask(
                 id=str(uuid.uuid4()),
                 description=f"Generate documentation for: {description}",
@@ -176,18 +300,70 @@ class TaskManager:
         """
         Get a task by ID.
         
+        The same Task object is returned while the stored version is
+        unchanged, so changes made through this manager are visible to every
+        caller. Checking the version is a single indexed lookup; the task is
+        only parsed and rebuilt when it changed.
+        
         Args:
             task_id: The task ID
             
         Returns:
             Task or None if not found
         """
+        version = self.storage.get_version(task_id)
+        
+        if version is None:
+            return None
+        
+        task = self._cached_task(task_id, version)
+        
+        if task is not None:
+            return task
+        
         task_data = self.storage.load_task(task_id)
         
         if not task_data:
             return None
         
-        return self._task_from_dict(task_data)
+        return self._cache_task_data(task_id, task_data)
+    
+    async def get_task_async(self, task_id: str) -> Optional[Task]:
+        """Like get_task(), but reads storage in a worker thread."""
+        version = await asyncio.to_thread(self.storage.get_version, task_id)
+        
+        if version is None:
+            return None
+        
+        task = self._cached_task(task_id, version)
+        
+        if task is not None:
+            return task
+        
+        task_data = await asyncio.to_thread(self.storage.load_task, task_id)
+        
+        if not task_data:
+            return None
+        
+        # Another caller may have loaded this version while this one waited
+        task = self._cached_task(task_id, task_data.get("last_updated_ns"))
+        
+        return task or self._cache_task_data(task_id, task_data)
+    
+    def _cached_task(self, task_id: str, version: Optional[int]) -> Optional[Task]:
+        """Get the cached task if it is at the given stored version."""
+        entry: Optional[Tuple[Optional[int], Task]] = self._task_cache.get(task_id)
+        
+        if entry is None or entry[0] != version:
+            return None
+        
+        return entry[1]
+    
+    def _cache_task_data(self, task_id: str, task_data: Dict[str, Any]) -> Task:
+        """Build a task from stored data and cache it."""
+        task = Task.from_dict(task_data)
+        self._task_cache.put(task_id, (task_data.get("last_updated_ns"), task))
+        return task
     
     def update_task_status(self, task_id: str, status: TaskStatus) -> bool:
         """
@@ -200,16 +376,48 @@ class TaskManager:
         Returns:
             True if updated
         """
-        success = self.storage.update_task_status(task_id, status)
+        versions = self.storage.update_task_status(task_id, status)
+        
+        if versions is None:
+            return False
+        
+        self._on_status_updated(task_id, status, *versions)
+        
+        return True
+    
+    async def update_task_status_async(self, task_id: str, status: TaskStatus) -> bool:
+        """Like update_task_status(), but writes storage in a worker thread."""
+        versions = await asyncio.to_thread(self.storage.update_task_status, task_id, status)
         
-        if success:
-            self.audit_logger.log_event(
-                task_id=task_id,
-                event_type="status_updated",
-                data={"new_status": status.value}
-            )
+        if versions is None:
+            return False
+        
+        self._on_status_updated(task_id, status, *versions)
+        
+        return True
+    
+    def _on_status_updated(
+        self,
+        task_id: str,
+        status: TaskStatus,
+        previous: Optional[int],
+        version: int
+    ) -> None:
+        """Apply a stored status change to the cached task and log it."""
+        # Only a copy of the version this write replaced can be patched;
+        # anything else misses another writer's changes and is dropped
+        task = self._cached_task(task_id, previous)
+        if task is not None:
+            task.status = status
+            self._task_cache.put(task_id, (version, task))
+        else:
+            self._task_cache.pop(task_id)
         
-        return success
+        self.audit_logger.log_event(
+            task_id=task_id,
+            event_type="status_updated",
+            data={"new_status": status.value}
+        )
     
     def update_subtask(
         self,
@@ -230,32 +438,77 @@ class TaskManager:
         Returns:
             True if updated
         """
-        task = self.get_task(task_id)
+        fields = self._subtask_fields(status, output)
+        
+        versions = self.storage.patch_subtask(task_id, subtask_id, fields)
         
-        if not task:
+        if versions is None:
             return False
         
-        for subtask in task.subtasks:
-            if subtask.id == subtask_id:
-                if status:
-                    subtask.status = status
-                if output is not None:
-                    subtask.output = output
-                
-                self._save_task(task)
-                
-                self.audit_logger.log_event(
-                    task_id=task_id,
-                    event_type="subtask_updated",
-                    data={
-                        "subtask_id": subtask_id,
-                        "status": status.value if status else None,
-                    }
-                )
-                
-                return True
-        
-        return False
+        self._on_subtask_updated(task_id, subtask_id, status, output, *versions)
+        
+        return True
+    
+    async def update_subtask_async(
+        self,
+        task_id: str,
+        subtask_id: str,
+        status: Optional[TaskStatus] = None,
+        output: Optional[Any] = None
+    ) -> bool:
+        """Like update_subtask(), but writes storage in a worker thread."""
+        fields = self._subtask_fields(status, output)
+        
+        versions = await asyncio.to_thread(self.storage.patch_subtask, task_id, subtask_id, fields)
+        
+        if versions is None:
+            return False
+        
+        self._on_subtask_updated(task_id, subtask_id, status, output, *versions)
+        
+        return True
+    
+    @staticmethod
+    def _subtask_fields(status: Optional[TaskStatus], output: Optional[Any]) -> Dict[str, Any]:
+        """Build the stored subtask keys for an update."""
+        fields: Dict[str, Any] = {}
+        if status:
+            fields["status"] = status.value
+        if output is not None:
+            fields["output"] = output
+        return fields
+    
+    def _on_subtask_updated(
+        self,
+        task_id: str,
+        subtask_id: str,
+        status: Optional[TaskStatus],
+        output: Optional[Any],
+        previous: Optional[int],
+        version: int
+    ) -> None:
+        """Apply a stored subtask change to the cached task and log it."""
+        # Keep a copy of the replaced version in step; any other copy is
+        # dropped and the task is loaded again on next use
+        task = self._cached_task(task_id, previous)
+        subtask = task.subtasks_by_id.get(subtask_id) if task is not None else None
+        if task is not None and subtask is not None:
+            if status:
+                subtask.status = status
+            if output is not None:
+                subtask.output = output
+            self._task_cache.put(task_id, (version, task))
+        else:
+            self._task_cache.pop(task_id)
+        
+        self.audit_logger.log_event(
+            task_id=task_id,
+            event_type="subtask_updated",
+            data={
+                "subtask_id": subtask_id,
+                "status": status.value if status else None,
+            }
+        )
     
     def list_tasks(
         self,
@@ -274,88 +527,23 @@ class TaskManager:
         """
         return self.storage.list_tasks(status, limit)
     
-    def _save_task(self, task: Task) -> None:
-        """Save task to storage."""
-        task_dict = self._task_to_dict(task)
-        self.storage.save_task(task.task_id, task_dict)
+    async def list_tasks_async(
+        self,
+        status: Optional[TaskStatus] = None,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """Like list_tasks(), but queries storage in a worker thread."""
+        return await asyncio.to_thread(self.storage.list_tasks, status, limit)
     
-    def _task_to_dict(self, task: Task) -> Dict[str, Any]:
-        """Convert task to dictionary."""
-        return {
-            "task_id": task.task_id,
-            "description": task.description,
-            "constraints": [
-                {
-                    "type": c.type.value,
-                    "description": c.description,
-                    "value": c.value,
-                    "required": c.required
-                }
-                for c in task.constraints
-            ],
-            "status": task.status.value,
-            "subtasks": [
-                {
-                    "id": st.id,
-                    "description": st.description,
-                    "agent_type": st.agent_type.value,
-                    "status": st.status.value,
-                    "output": st.output,
-                    "dependencies": st.dependencies,
-                    "metadata": st.metadata,
-                }
-                for st in task.subtasks
-            ],
-            "created_at": task.created_at,
-            "output": task.output,
-            "context": task.context,
-            "metadata": task.metadata,
-        }
+    async def save_task_async(self, task: Task) -> None:
+        """Save task to storage from a worker thread."""
+        task_dict = task.to_dict()
+        version = await asyncio.to_thread(self.storage.save_task, task.task_id, task_dict)
+        self._task_cache.put(task.task_id, (version, task))
     
-    def _task_from_dict(self, data: Dict[str, Any]) -> Task:
-        """Convert dictionary to task."""
-        from .utils.constraints import Constraint, ConstraintType
-        
-        # Deserialize constraints from stored dictionaries
-        constraints = []
-        for c_data in data.get("constraints", []):
-            # Handle both old string format and new dict format for backwards compatibility
-            if isinstance(c_data, str):
-                # Old format: just store as custom constraint
-                constraints.append(Constraint(
-                    type=ConstraintType.CUSTOM,
-                    description=c_data,
-                    required=True
-                ))
-            else:
-                # New format: reconstruct from dictionary
-                constraints.append(Constraint(
-                    type=ConstraintType(c_data["type"]),
-                    description=c_data["description"],
-                    value=c_data.get("value"),
-                    required=c_data.get("required", True)
-                ))
-        
-        return Task(
-            task_id=data["task_id"],
-            description=data["description"],
-            constraints=constraints,
-            status=TaskStatus(data["status"]),
-            subtasks=[
-                Subtask(
-                    id=st["id"],
-                    description=st["description"],
-                    agent_type=AgentType(st["agent_type"]),
-                    status=TaskStatus(st["status"]),
-                    output=st.get("output"),
-                    dependencies=st.get("dependencies", []),
-                    metadata=st.get("metadata", {}),
-                )
-                for st in data.get("subtasks", [])
-            ],
-            created_at=data["created_at"],
-            output=data.get("output"),
-            context=data.get("context", {}),
-            metadata=data.get("metadata", {}),
-        )
+    def _save_task(self, task: Task) -> None:
+        """Save task to storage."""
+        task_dict = task.to_dict()
+        version = self.storage.save_task(task.task_id, task_dict)
+        self._task_cache.put(task.task_id, (version, task))
 
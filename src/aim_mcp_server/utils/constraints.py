@@ -4,7 +4,8 @@ Constraint parsing and validation utilities.
 
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Union
 import re
 
 
@@ -22,18 +23,42 @@ class ConstraintType(Enum):
     CUSTOM = "custom"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Constraint:
-    """Represents a single constraint on a task."""
+    """Represents a single constraint on a task (immutable and hashable)."""
     type: ConstraintType
     description: str
     value: Optional[Any] = None
     required: bool = True
     
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert constraint to a JSON-serializable dictionary."""
+        return {
+            "type": self.type.value,
+            "description": self.description,
+            "value": self.value,
+            "required": self.required
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Constraint":
+        """Reconstruct a constraint from to_dict() output."""
+        return cls(
+            type=ConstraintType(data["type"]),
+            description=data["description"],
+            value=data.get("value"),
+            required=data.get("required", True)
+        )
+    
     def __str__(self) -> str:
         return f"{self.type.value}: {self.description}" + (f" ({self.value})" if self.value else "")
 
 
+# Markers that start an explicit requirement line ("- item", "1. item")
+LIST_BULLETS = ("-", "•")
+DIGITS = "0123456789"
+
+
 class ConstraintParser:
     """Parses task descriptions to extract constraints."""
     
@@ -59,56 +84,101 @@ class ConstraintParser:
         ],
     }
     
+    # PATTERNS flattened and compiled once, in the same order
+    COMPILED_PATTERNS = [
+        (constraint_type, re.compile(pattern, re.IGNORECASE), value_group)
+        for constraint_type, patterns in PATTERNS.items()
+        for pattern, value_group in patterns
+    ]
+    
+    # Case-sensitive copies for matching an already-lowercased description,
+    # which avoids case folding at every step of every scan. PATTERNS only
+    # use lowercase escapes (\d, \s, \w), so lowercasing them is safe.
+    LOWERCASE_PATTERNS = [
+        (constraint_type, re.compile(pattern.lower()), value_group)
+        for constraint_type, patterns in PATTERNS.items()
+        for pattern, value_group in patterns
+    ]
+    
     @classmethod
     def parse(cls, task_description: str) -> List[Constraint]:
         """
         Parse task description to extract constraints.
         
+        Results are memoized per description; each call returns a new list.
+        
         Args:
             task_description: The task description text
             
         Returns:
             List of extracted constraints
         """
+        return list(cls._parse_cached(task_description))
+    
+    @classmethod
+    def cache_info(cls) -> Any:
+        """Hit/miss statistics of the parse() cache (an lru_cache CacheInfo)."""
+        return cls._parse_cached.cache_info()
+    
+    @classmethod
+    @lru_cache(maxsize=1024)
+    def _parse_cached(cls, task_description: str) -> Tuple[Constraint, ...]:
+        """Parse a description; see parse()."""
         constraints = []
         
-        # Extract constraints using patterns
-        for constraint_type, patterns in cls.PATTERNS.items():
-            for pattern, value_group in patterns:
-                matches = re.finditer(pattern, task_description, re.IGNORECASE)
-                for match in matches:
-                    value = match.group(1) if value_group == "value" else None
-                    # Convert percentage strings to float
-                    if constraint_type == ConstraintType.TEST_COVERAGE and value:
-                        value = float(value)
-                    
-                    constraint = Constraint(
-                        type=constraint_type,
-                        description=match.group(0),
-                        value=value,
-                        required=True
-                    )
-                    constraints.append(constraint)
+        # str.lower() keeps offsets for ASCII text, so spans found in the
+        # lowercased copy slice the original casing back out. Other text
+        # keeps the case-insensitive patterns.
+        if task_description.isascii():
+            haystack = task_description.lower()
+            compiled_patterns = cls.LOWERCASE_PATTERNS
+        else:
+            haystack = task_description
+            compiled_patterns = cls.COMPILED_PATTERNS
         
-        # Extract explicit requirements (bullet points or numbered lists)
-        requirement_patterns = [
-            r"[-•]\s*(.+?)(?:\n|$)",
-            r"\d+\.\s*(.+?)(?:\n|$)",
-        ]
+        # Extract constraints using patterns
+        for constraint_type, pattern, value_group in compiled_patterns:
+            for match in pattern.finditer(haystack):
+                matched = task_description[slice(*match.span(1))] if value_group == "value" else None
+                value: Union[str, float, None] = matched
+                # Convert percentage strings to float
+                if constraint_type == ConstraintType.TEST_COVERAGE and matched:
+                    value = float(matched)
+                
+                constraint = Constraint(
+                    type=constraint_type,
+                    description=task_description[match.start():match.end()],
+                    value=value,
+                    required=True
+                )
+                constraints.append(constraint)
         
-        for pattern in requirement_patterns:
-            matches = re.finditer(pattern, task_description)
-            for match in matches:
-                requirement = match.group(1).strip()
-                if requirement and len(requirement) > 5:  # Filter out noise
-                    constraint = Constraint(
-                        type=ConstraintType.CUSTOM,
-                        description=requirement,
-                        required=True
-                    )
-                    constraints.append(constraint)
+        # Extract explicit requirements (bullet points or numbered lists).
+        # Only a marker at the start of a line opens an item, so hyphenated
+        # words and markers nested inside an item ("1. Do X - Y") don't.
+        for line in task_description.splitlines():
+            item = line.lstrip()
+            
+            if item[:1] in LIST_BULLETS:
+                requirement = item[1:].strip()
+            elif item[:1].isdigit():
+                marker_end = len(item) - len(item.lstrip(DIGITS))
+                if item[marker_end:marker_end + 1] != ".":
+                    continue
+                requirement = item[marker_end + 1:].strip()
+            else:
+                continue
+            
+            if len(requirement) > 5:  # Filter out noise
+                constraint = Constraint(
+                    type=ConstraintType.CUSTOM,
+                    description=requirement,
+                    required=True
+                )
+                constraints.append(constraint)
         
-        return constraints
+        # Drop repeated constraints (e.g. the same bullet twice), keeping order
+        return tuple(dict.fromkeys(constraints))
     
     @classmethod
     def validate_constraint(cls, constraint: Constraint, output: Any) -> tuple[bool, Optional[str]]:
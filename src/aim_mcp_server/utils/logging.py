@@ -2,23 +2,61 @@
 Audit trail and logging utilities.
 """
 
-import json
+import atexit
 import logging
-from datetime import datetime
+import queue
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
 import os
 
+from .serialization import dumps_bytes, loads
+
+
+# Sentinel telling the flusher thread to exit
+_STOP = object()
+
+# Size at which a task log is rolled over to a numbered segment
+MAX_FILE_BYTES = 4 * 1024 * 1024
+
 
 class AuditLogger:
-    """Manages audit trail logging for task execution."""
+    """
+    Manages audit trail logging for task execution.
+    
+    Events are queued and written by a background thread, which appends
+    everything that arrives within one flush interval in a single write per
+    task log file. The thread keeps recently used log files open.
+    
+    Each task logs to {task_id}.jsonl. Once that file grows past
+    max_file_bytes it is renamed to {task_id}.N.jsonl (N = 1, 2, ...) and a
+    new one is started.
+    """
     
-    def __init__(self, log_dir: Optional[Path] = None):
+    def __init__(
+        self,
+        log_dir: Optional[Path] = None,
+        flush_interval_ms: float = 50.0,
+        max_batch: int = 128,
+        max_pending: int = 10000,
+        max_open_files: int = 512,
+        max_file_bytes: int = MAX_FILE_BYTES
+    ):
         """
         Initialize audit logger.
         
         Args:
             log_dir: Directory for audit logs (defaults to ~/.aim/logs/)
+            flush_interval_ms: How long the flusher waits for more events
+                after the first one before writing
+            max_batch: Maximum number of events written per batch
+            max_pending: Queue size at which logging blocks until the
+                flusher catches up
+            max_open_files: Number of task log files kept open; the least
+                recently written one is closed beyond this
+            max_file_bytes: Size at which a task log is rolled over
         """
         if log_dir is None:
             log_dir = Path.home() / ".aim" / "logs"
@@ -26,6 +64,19 @@ class AuditLogger:
         self.log_dir = log_dir
         self.log_dir.mkdir(parents=True, exist_ok=True)
         
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_batch = max_batch
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._flusher: Optional[threading.Thread] = None
+        self._flusher_lock = threading.Lock()
+        self.max_open_files = max_open_files
+        self.max_file_bytes = max_file_bytes
+        # Open log files by task ID, least recently written first. Only
+        # the flusher thread touches these.
+        self._handles: "OrderedDict[str, BinaryIO]" = OrderedDict()
+        # (second, formatted "YYYY-MM-DDTHH:MM:SS") of the last timestamp
+        self._second_prefix: Tuple[Optional[int], str] = (None, "")
+        
         # Setup Python logger
         self.logger = logging.getLogger("aim_mcp_server")
         self.logger.setLevel(logging.INFO)
@@ -50,20 +101,173 @@ class AuditLogger:
             event_type: Type of event (e.g., 'task_created', 'subtask_assigned')
             data: Event data
         """
-        event = {
-            "timestamp": datetime.utcnow().isoformat(),
+        self.log_events_batch([self._build_event(task_id, event_type, data)])
+    
+    def log_events_batch(self, events: List[Dict[str, Any]]) -> None:
+        """
+        Queue several events for the audit trail.
+        
+        Args:
+            events: Events built by _build_event(), in the order they occurred
+        """
+        self._ensure_flusher()
+        
+        for event in events:
+            # Blocks only when max_pending events are waiting
+            self._queue.put(event)
+    
+    def flush(self) -> None:
+        """Wait until every queued event has been written."""
+        if self._flusher is not None:
+            self._queue.join()
+    
+    def close(self) -> None:
+        """Write all queued events and stop the flusher thread."""
+        with self._flusher_lock:
+            flusher, self._flusher = self._flusher, None
+        
+        if flusher is not None:
+            self._queue.put(_STOP)
+            flusher.join()
+            # Registered again if logging restarts the flusher
+            atexit.unregister(self.close)
+        
+        while self._handles:
+            self._handles.popitem(last=False)[1].close()
+    
+    def _ensure_flusher(self) -> None:
+        """Start the flusher thread on first use."""
+        if self._flusher is not None:
+            return
+        
+        with self._flusher_lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(
+                    target=self._flush_loop, name="aim-audit-flusher", daemon=True
+                )
+                self._flusher.start()
+                atexit.register(self.close)
+    
+    def _flush_loop(self) -> None:
+        """Drain the queue in batches until told to stop."""
+        stop = False
+        while not stop:
+            events = []
+            item = self._queue.get()
+            deadline = time.monotonic() + self.flush_interval
+            
+            while True:
+                if item is _STOP:
+                    stop = True
+                    self._queue.task_done()
+                    break
+                
+                events.append(item)
+                if len(events) >= self.max_batch:
+                    break
+                
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+            
+            if events:
+                try:
+                    self._write_events(events)
+                except Exception:
+                    self.logger.exception("Failed to write %d audit events", len(events))
+                finally:
+                    for _ in events:
+                        self._queue.task_done()
+    
+    def _write_events(self, events: List[Dict[str, Any]]) -> None:
+        """Write events to their task log files, opening each file once."""
+        # Each event is serialized once; the console reuses the same bytes
+        payloads = [dumps_bytes(event) for event in events]
+        
+        lines_by_task: Dict[str, List[bytes]] = {}
+        for event, payload in zip(events, payloads):
+            lines_by_task.setdefault(event["task_id"], []).append(payload + b"\n")
+        
+        # Log to file
+        for task_id, lines in lines_by_task.items():
+            f = self._get_handle(task_id)
+            f.write(b"".join(lines))
+            f.flush()
+            
+            if f.tell() >= self.max_file_bytes:
+                self._rotate(task_id)
+        
+        # Log to console; the full payload only at DEBUG
+        debug = self.logger.isEnabledFor(logging.DEBUG)
+        for event, payload in zip(events, payloads):
+            if debug:
+                self.logger.debug(
+                    "[%s] %s: %s", event["task_id"], event["event_type"], payload.decode()
+                )
+            else:
+                self.logger.info("[%s] %s", event["task_id"], event["event_type"])
+    
+    def _get_handle(self, task_id: str) -> BinaryIO:
+        """Get the open log file of a task, opening it if needed."""
+        f = self._handles.get(task_id)
+        
+        if f is None:
+            if len(self._handles) >= self.max_open_files:
+                self._handles.popitem(last=False)[1].close()
+            f = self._handles[task_id] = open(self.log_dir / f"{task_id}.jsonl", "ab")
+        else:
+            self._handles.move_to_end(task_id)
+        
+        return f
+    
+    def _rotate(self, task_id: str) -> None:
+        """Close a task's log file and rename it to the next segment number."""
+        self._handles.pop(task_id).close()
+        
+        segment = len(self._segments(task_id)) + 1
+        os.replace(
+            self.log_dir / f"{task_id}.jsonl",
+            self.log_dir / f"{task_id}.{segment}.jsonl"
+        )
+    
+    def _segments(self, task_id: str) -> List[Path]:
+        """Get a task's rolled-over log segments, oldest first."""
+        segments = []
+        for path in self.log_dir.glob(f"{task_id}.*.jsonl"):
+            number = path.name[len(task_id) + 1:-len(".jsonl")]
+            if number.isdigit():
+                segments.append((int(number), path))
+        
+        return [path for _, path in sorted(segments)]
+    
+    def _build_event(self, task_id: str, event_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build an audit event record, timestamped now."""
+        return {
+            "timestamp": self._timestamp(),
             "task_id": task_id,
             "event_type": event_type,
             "data": data
         }
+    
+    def _timestamp(self) -> str:
+        """
+        Get the current UTC time as an ISO string with microseconds.
         
-        # Log to file
-        log_file = self.log_dir / f"{task_id}.jsonl"
-        with open(log_file, "a") as f:
-            f.write(json.dumps(event) + "\n")
+        Events arrive in bursts, so the date and time of day are formatted
+        once per second and only the microseconds per event.
+        """
+        seconds, nanoseconds = divmod(time.time_ns(), 1_000_000_000)
+        
+        cached_second, prefix = self._second_prefix
+        if cached_second != seconds:
+            prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+            self._second_prefix = (seconds, prefix)
         
-        # Log to console
-        self.logger.info(f"[{task_id}] {event_type}: {json.dumps(data, indent=2)}")
+        return f"{prefix}.{nanoseconds // 1000:06d}"
     
     def get_audit_trail(self, task_id: str) -> list[Dict[str, Any]]:
         """
@@ -75,16 +279,17 @@ class AuditLogger:
         Returns:
             List of audit events
         """
-        log_file = self.log_dir / f"{task_id}.jsonl"
+        # Make events logged so far visible in the file
+        self.flush()
         
-        if not log_file.exists():
-            return []
-        
-        events = []
-        with open(log_file, "r") as f:
-            for line in f:
-                if line.strip():
-                    events.append(json.loads(line))
+        events: List[Dict[str, Any]] = []
+        for log_file in [*self._segments(task_id), self.log_dir / f"{task_id}.jsonl"]:
+            try:
+                data = log_file.read_bytes()
+            except FileNotFoundError:
+                continue
+            
+            events.extend(loads(line) for line in data.splitlines() if line.strip())
         
         return events
 
@@ -0,0 +1,65 @@
+"""
+JSON serialization helpers.
+
+Uses orjson when it is installed and falls back to the standard library
+otherwise, so orjson stays an optional speedup.
+"""
+
+from typing import Any, Union
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    import json
+    HAS_ORJSON = False
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """
+    Serialize an object to a JSON string.
+    
+    Args:
+        obj: The object to serialize
+        indent: Pretty-print with two-space indentation
+    
+    Returns:
+        JSON text
+    """
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+    
+    return json.dumps(obj, indent=2 if indent else None)
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """
+    Serialize an object to compact UTF-8 encoded JSON.
+    
+    Args:
+        obj: The object to serialize
+    
+    Returns:
+        JSON bytes, ready to write to a binary file
+    """
+    if HAS_ORJSON:
+        return orjson.dumps(obj)
+    
+    return json.dumps(obj).encode()
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """
+    Parse JSON text or bytes.
+    
+    Args:
+        data: JSON document
+    
+    Returns:
+        The parsed object
+    """
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    
+    return json.loads(data)
+
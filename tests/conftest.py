@@ -0,0 +1,23 @@
+"""
+Shared test fixtures.
+"""
+
+import pytest
+from aim_mcp_server.storage import Storage
+from aim_mcp_server.task_manager import TaskManager
+from aim_mcp_server.utils.logging import AuditLogger
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """Task manager storing under a fresh temporary directory."""
+    task_manager = TaskManager(
+        storage=Storage(tmp_path / "tasks"),
+        audit_logger=AuditLogger(tmp_path / "logs")
+    )
+    
+    yield task_manager
+    
+    task_manager.audit_logger.close()
+    task_manager.storage.close()
+
@@ -0,0 +1,68 @@
+"""
+Tests for agent routing helpers.
+"""
+
+import httpx
+import pytest
+from anthropic import APIConnectionError
+from aim_mcp_server.agents import claude
+from aim_mcp_server.agents.base import AgentTask, FAST_TIER_MAX_LENGTH, classify_task_tier
+from aim_mcp_server.agents.claude import DEFAULT_TIER_MODELS, ClaudeAgent
+
+
+def make_task(description: str) -> AgentTask:
+    """Build a bare task with the given description."""
+    return AgentTask(id="t", description=description, context={}, constraints=[])
+
+
+def test_classify_task_tier():
+    """Test fast, frontier and default tier classification."""
+    assert classify_task_tier(make_task("Rename the helper function")) == "fast"
+    assert classify_task_tier(make_task("Do a security audit of the login flow")) == "frontier"
+    assert classify_task_tier(make_task("Implement a caching layer")) == "mid"
+
+
+def test_fast_tier_length_cutoff():
+    """Test that only short descriptions are classified as fast."""
+    short = "Rename x" + " " * (FAST_TIER_MAX_LENGTH - len("Rename x"))
+    long = short + " "
+    
+    assert len(short) == FAST_TIER_MAX_LENGTH
+    assert classify_task_tier(make_task(short)) == "fast"
+    assert classify_task_tier(make_task(long)) == "mid"
+
+
+def test_tier_models_opt_in():
+    """Test that the configured model is used unless tier models are given."""
+    task = make_task("Fix typos in the README")
+    
+    agent = ClaudeAgent(model="my-model", api_key="test-key")
+    assert agent._model_for_task(task) == "my-model"
+    
+    tiered = ClaudeAgent(model="my-model", api_key="test-key", tier_models=DEFAULT_TIER_MODELS)
+    assert tiered._model_for_task(task) == DEFAULT_TIER_MODELS["fast"]
+    assert tiered._model_for_task(make_task("Implement a caching layer")) == "my-model"
+
+
+@pytest.mark.asyncio
+async def test_call_with_retries(monkeypatch):
+    """Test that transient errors are retried up to max_retries."""
+    monkeypatch.setattr(claude, "_retry_delay", lambda attempt: 0)
+    agent = ClaudeAgent(api_key="test-key", max_retries=2)
+    calls = []
+    
+    async def flaky() -> str:
+        calls.append(1)
+        if len(calls) < 3:
+            raise APIConnectionError(request=httpx.Request("GET", "https://api.anthropic.com"))
+        return "ok"
+    
+    assert await agent._call_with_retries(flaky) == "ok"
+    assert len(calls) == 3
+    
+    calls.clear()
+    agent.max_retries = 1
+    with pytest.raises(APIConnectionError):
+        await agent._call_with_retries(flaky)
+    assert len(calls) == 2
+
@@ -0,0 +1,99 @@
+"""
+Tests for audit logging.
+"""
+
+import json
+
+import pytest
+from aim_mcp_server.utils.logging import AuditLogger
+
+
+@pytest.fixture
+def audit_logger(tmp_path):
+    """Audit logger writing to a temporary directory."""
+    logger = AuditLogger(tmp_path)
+    yield logger
+    logger.close()
+
+
+def test_audit_trail_in_order(audit_logger):
+    """Test that logged events read back complete and in order."""
+    for i in range(200):
+        audit_logger.log_event("t1", "step", {"i": i})
+    
+    trail = audit_logger.get_audit_trail("t1")
+    
+    assert [event["data"]["i"] for event in trail] == list(range(200))
+    assert all(event["event_type"] == "step" for event in trail)
+    assert audit_logger.get_audit_trail("missing") == []
+
+
+def test_close_writes_pending_events(tmp_path):
+    """Test that close() writes queued events and stops the flusher."""
+    # A long flush interval keeps events queued until close()
+    audit_logger = AuditLogger(tmp_path, flush_interval_ms=60_000)
+    audit_logger.log_event("t1", "a", {})
+    audit_logger.log_event("t1", "b", {})
+    flusher = audit_logger._flusher
+    
+    audit_logger.close()
+    
+    assert not flusher.is_alive()
+    lines = (tmp_path / "t1.jsonl").read_text().splitlines()
+    assert [json.loads(line)["event_type"] for line in lines] == ["a", "b"]
+
+
+def test_logging_after_close_restarts_flusher(audit_logger):
+    """Test that logging after close() starts a new flusher."""
+    audit_logger.log_event("t1", "before", {})
+    audit_logger.close()
+    
+    audit_logger.log_event("t1", "after", {})
+    
+    assert audit_logger._flusher is not None and audit_logger._flusher.is_alive()
+    assert [e["event_type"] for e in audit_logger.get_audit_trail("t1")] == ["before", "after"]
+
+
+def test_log_rotation(tmp_path):
+    """Test that full log files roll over into numbered segments."""
+    audit_logger = AuditLogger(tmp_path, flush_interval_ms=1, max_file_bytes=1000)
+    try:
+        for i in range(100):
+            audit_logger.log_event("t1", "step", {"i": i})
+            audit_logger.flush()
+        
+        segments = sorted(path.name for path in tmp_path.glob("t1.*.jsonl"))
+        assert len(segments) > 2
+        assert segments == sorted(f"t1.{n}.jsonl" for n in range(1, len(segments) + 1))
+        # Older segments hold earlier events
+        first = json.loads((tmp_path / "t1.1.jsonl").read_text().splitlines()[0])
+        assert first["data"]["i"] == 0
+        
+        trail = audit_logger.get_audit_trail("t1")
+        assert [event["data"]["i"] for event in trail] == list(range(100))
+    finally:
+        audit_logger.close()
+
+
+def test_open_handles_are_bounded(tmp_path):
+    """Test that the least recently written log file is closed past max_open_files."""
+    audit_logger = AuditLogger(tmp_path, flush_interval_ms=1, max_open_files=2)
+    try:
+        audit_logger.log_event("t0", "step", {})
+        audit_logger.flush()
+        first_handle = audit_logger._handles["t0"]
+        
+        for task_id in ("t1", "t2"):
+            audit_logger.log_event(task_id, "step", {})
+            audit_logger.flush()
+        
+        assert list(audit_logger._handles) == ["t1", "t2"]
+        assert first_handle.closed
+        
+        # An evicted task's file is reopened on its next event
+        audit_logger.log_event("t0", "again", {})
+        assert [e["event_type"] for e in audit_logger.get_audit_trail("t0")] == ["step", "again"]
+    finally:
+        audit_logger.close()
+
+
@@ -2,9 +2,15 @@
 Tests for refinement loop.
 """
 
+import asyncio
+
 import pytest
+from aim_mcp_server.agents.base import Agent, AgentOutput, AgentTask, AgentType
+from aim_mcp_server.agents.batching import BatchDispatcher
+from aim_mcp_server.agents.registry import AgentRegistry
 from aim_mcp_server.refinement_loop import RefinementLoop
-from aim_mcp_server.utils.constraints import Constraint, ConstraintType
+from aim_mcp_server.review import ReviewSystem
+from aim_mcp_server.utils.constraints import Constraint, ConstraintParser, ConstraintType
 
 
 @pytest.mark.asyncio
@@ -53,3 +59,102 @@ async def test_refinement_iterations():
     assert len(result.iterations) > 0
     assert result.iterations[0].iteration == 0
 
+
+class BatchingAgent(Agent):
+    """Agent that records the size of each execute_many() call."""
+    
+    def __init__(self):
+        super().__init__(AgentType.GENERAL, [])
+        self.batch_sizes = []
+    
+    async def execute(self, task):
+        return (await self.execute_many([task]))[0]
+    
+    async def execute_many(self, tasks):
+        self.batch_sizes.append(len(tasks))
+        return [AgentOutput(task_id=t.id, success=True, output=t.id, metadata={}) for t in tasks]
+    
+    async def validate_capability(self, capability):
+        return True
+    
+    @property
+    def supports_batching(self):
+        return True
+
+
+@pytest.mark.asyncio
+async def test_batch_dispatcher_coalesces_concurrent_tasks():
+    """Test that concurrent submissions share one execute_many() call."""
+    agent = BatchingAgent()
+    dispatcher = BatchDispatcher(max_batch_size=8, flush_interval_ms=10)
+    
+    outputs = await asyncio.gather(*[
+        dispatcher.execute(agent, AgentTask(id=f"t{i}", description="d", context={}, constraints=[]))
+        for i in range(5)
+    ])
+    
+    assert [o.output for o in outputs] == ["t0", "t1", "t2", "t3", "t4"]
+    assert agent.batch_sizes == [5]
+
+
+
+class ShortBatchAgent(BatchingAgent):
+    """Agent whose execute_many() drops the last output."""
+    
+    async def execute_many(self, tasks):
+        return (await super().execute_many(tasks))[:-1]
+
+
+@pytest.mark.asyncio
+async def test_batch_dispatcher_fails_tasks_without_output():
+    """Test that a short execute_many() result fails futures instead of hanging."""
+    agent = ShortBatchAgent()
+    dispatcher = BatchDispatcher(max_batch_size=8, flush_interval_ms=10)
+    
+    results = await asyncio.wait_for(asyncio.gather(*[
+        dispatcher.execute(agent, AgentTask(id=f"t{i}", description="d", context={}, constraints=[]))
+        for i in range(3)
+    ], return_exceptions=True), timeout=5)
+    
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+class CountingReviewAgent(Agent):
+    """Review agent that counts its calls and always finds one issue."""
+    
+    def __init__(self):
+        super().__init__(AgentType.REVIEW, [])
+        self.calls = 0
+    
+    async def execute(self, task):
+        self.calls += 1
+        return AgentOutput(task_id=task.id, success=True, output="- Minor issue: naming", metadata={})
+    
+    async def validate_capability(self, capability):
+        return True
+
+
+@pytest.mark.asyncio
+async def test_fail_fast_skips_review(monkeypatch):
+    """Test that fail-fast reports every failed constraint and scores 0.0."""
+    monkeypatch.setattr(ConstraintParser, "validate_constraint", lambda constraint, output: (False, "bad"))
+    registry = AgentRegistry()
+    review_agent = CountingReviewAgent()
+    registry.register_agent(AgentType.REVIEW, review_agent)
+    review_system = ReviewSystem(registry)
+    constraints = [
+        Constraint(type=ConstraintType.OUTPUT_FORMAT, description=f"Format {i}")
+        for i in range(5)
+    ]
+    
+    result = await review_system.validate_output("output", constraints, "task", fail_fast=True)
+    
+    assert review_agent.calls == 0
+    assert len(result.issues) == 5
+    assert result.score == 0.0
+    assert not result.perfect_match
+    
+    result = await review_system.validate_output("output", constraints, "task")
+    
+    assert review_agent.calls == 1
+    assert len(result.issues) == 6
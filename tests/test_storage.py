@@ -0,0 +1,99 @@
+"""
+Tests for the SQLite storage layer.
+"""
+
+import json
+
+import pytest
+from aim_mcp_server.storage import Storage, TaskStatus, _format_ns
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """Storage in a fresh temporary directory."""
+    store = Storage(tmp_path)
+    yield store
+    store.close()
+
+
+def test_save_and_load_task(storage):
+    """Test that saved tasks load back with their version."""
+    version = storage.save_task("t1", {"task_id": "t1", "status": "pending", "description": "Do it"})
+    
+    task_data = storage.load_task("t1")
+    
+    assert task_data["description"] == "Do it"
+    assert task_data["last_updated_ns"] == version
+    assert storage.get_version("t1") == version
+    assert storage.load_task("missing") is None
+    assert storage.get_version("missing") is None
+
+
+def test_list_tasks_filters_and_orders(storage):
+    """Test status filtering and most-recently-updated-first ordering."""
+    storage.save_task("a", {"status": "pending", "description": "A"})
+    storage.save_task("b", {"status": "completed", "description": "B"})
+    storage.save_task("c", {"status": "pending", "description": "C"})
+    storage.update_task_status("a", TaskStatus.PENDING)  # touch a last
+    
+    assert [t["task_id"] for t in storage.list_tasks()] == ["a", "c", "b"]
+    assert [t["task_id"] for t in storage.list_tasks(TaskStatus.PENDING)] == ["a", "c"]
+    assert [t["task_id"] for t in storage.list_tasks(limit=1)] == ["a"]
+
+
+def test_patch_subtask(storage):
+    """Test that patching a subtask updates only its fields and bumps the version."""
+    version = storage.save_task("t1", {
+        "status": "pending",
+        "subtasks": [{"id": "s1", "status": "pending"}, {"id": "s2", "status": "pending"}],
+    })
+    
+    previous, new_version = storage.patch_subtask("t1", "s2", {"status": "completed", "output": "done"})
+    
+    subtasks = storage.load_task("t1")["subtasks"]
+    assert subtasks[0] == {"id": "s1", "status": "pending"}
+    assert subtasks[1] == {"id": "s2", "status": "completed", "output": "done"}
+    assert previous == version
+    assert new_version > version
+    assert storage.get_version("t1") == new_version
+    assert storage.patch_subtask("t1", "missing", {"status": "failed"}) is None
+    assert storage.patch_subtask("missing", "s1", {"status": "failed"}) is None
+
+
+def test_versions_increase_when_clock_repeats(storage, monkeypatch):
+    """Test that every write gets a larger version even if the clock stands still."""
+    monkeypatch.setattr("aim_mcp_server.storage.time.time_ns", lambda: 1000)
+    storage.save_task("t1", {"status": "pending", "subtasks": [{"id": "s1"}]})
+    
+    assert storage.update_task_status("t1", TaskStatus.IN_PROGRESS) == (1000, 1001)
+    assert storage.patch_subtask("t1", "s1", {"status": "completed"}) == (1001, 1002)
+    assert storage.save_task("t1", {"status": "completed"}) == 1003
+
+
+def test_import_legacy_files(tmp_path):
+    """Test that per-task JSON files from earlier versions are imported once."""
+    (tmp_path / "old.json").write_text(json.dumps({
+        "task_id": "old",
+        "status": "completed",
+        "description": "Legacy task",
+    }))
+    
+    storage = Storage(tmp_path)
+    try:
+        task_data = storage.load_task("old")
+        
+        assert task_data["description"] == "Legacy task"
+        # The blob and the version column agree, so cached copies validate
+        assert task_data["last_updated_ns"] == storage.get_version("old")
+        assert not (tmp_path / "old.json").exists()
+        assert (tmp_path / "old.json.imported").exists()
+        assert [t["task_id"] for t in storage.list_tasks(TaskStatus.COMPLETED)] == ["old"]
+    finally:
+        storage.close()
+
+
+def test_format_ns():
+    """Test that versions are shown as naive UTC ISO timestamps."""
+    assert _format_ns(1_700_000_000_123_456_000) == "2023-11-14T22:13:20.123456"
+    assert _format_ns(None) is None
+
@@ -3,14 +3,13 @@ Tests for task manager.
 """
 
 import pytest
-from aim_mcp_server.task_manager import TaskManager
-from aim_mcp_server.storage import TaskStatus
+from aim_mcp_server.task_manager import Task, TaskManager
+from aim_mcp_server.storage import Storage, TaskStatus
+from aim_mcp_server.utils.constraints import Constraint, ConstraintParser, ConstraintType
 
 
-def test_create_task():
+def test_create_task(manager):
     """Test task creation."""
-    manager = TaskManager()
-    
     task = manager.create_task(
         description="Create a Python function to calculate fibonacci numbers with unit tests",
         context={"language": "Python"}
@@ -23,10 +22,8 @@ def test_create_task():
     assert len(task.subtasks) > 0
 
 
-def test_get_task():
+def test_get_task(manager):
     """Test task retrieval."""
-    manager = TaskManager()
-    
     # Create a task
     task = manager.create_task(
         description="Test task",
@@ -41,10 +38,8 @@ def test_get_task():
     assert retrieved.description == task.description
 
 
-def test_update_task_status():
+def test_update_task_status(manager):
     """Test task status update."""
-    manager = TaskManager()
-    
     # Create a task
     task = manager.create_task(
         description="Test task",
@@ -60,10 +55,63 @@ def test_update_task_status():
     assert retrieved.status == TaskStatus.IN_PROGRESS
 
 
-def test_list_tasks():
-    """Test task listing."""
-    manager = TaskManager()
+def test_get_task_uses_cache(manager, monkeypatch):
+    """Test that cached tasks only check their stored version, not reload."""
+    task = manager.create_task(description="Test task", context={})
+    manager.update_task_status(task.task_id, TaskStatus.COMPLETED)
+    
+    version_checks = []
+    get_version = manager.storage.get_version
+    monkeypatch.setattr(
+        manager.storage, "get_version",
+        lambda task_id: version_checks.append(task_id) or get_version(task_id)
+    )
+    monkeypatch.setattr(manager.storage, "load_task", None)  # a reload would fail
+    retrieved = manager.get_task(task.task_id)
+    
+    assert retrieved is task
+    assert retrieved.status == TaskStatus.COMPLETED
+    assert version_checks == [task.task_id]
+
+
+@pytest.fixture
+def other(manager):
+    """Second task manager with its own connection to the same database."""
+    other_manager = TaskManager(
+        storage=Storage(manager.storage.storage_dir),
+        audit_logger=manager.audit_logger
+    )
+    
+    yield other_manager
+    
+    other_manager.storage.close()
+
+
+def test_get_task_sees_other_writers(manager, other):
+    """Test that cached tasks are reloaded after another process updates them."""
+    task = manager.create_task(description="Test task", context={})
+    assert other.get_task(task.task_id).status == TaskStatus.PENDING
+    
+    manager.update_task_status(task.task_id, TaskStatus.FAILED)
+    
+    assert other.get_task(task.task_id).status == TaskStatus.FAILED
+
+
+def test_update_after_other_writer_reloads_task(manager, other):
+    """Test that a local update doesn't stamp a stale cached copy as current."""
+    task = manager.create_task(description="Implement and test it", context={})
+    first, second = (st.id for st in task.subtasks)
     
+    other.update_subtask(task.task_id, first, status=TaskStatus.COMPLETED)
+    manager.update_subtask(task.task_id, second, status=TaskStatus.IN_PROGRESS)
+    
+    reloaded = manager.get_task(task.task_id)
+    assert reloaded.subtasks_by_id[first].status == TaskStatus.COMPLETED
+    assert reloaded.subtasks_by_id[second].status == TaskStatus.IN_PROGRESS
+
+
+def test_list_tasks(manager):
+    """Test task listing."""
     # Create some tasks
     manager.create_task("Task 1", {})
     manager.create_task("Task 2", {})
@@ -71,17 +119,57 @@ def test_list_tasks():
     # List all tasks
     tasks = manager.list_tasks()
     
-    assert len(tasks) >= 2
+    assert len(tasks) == 2
 
 
-def test_constraint_parsing():
+def test_constraint_parsing(manager):
     """Test constraint extraction."""
-    manager = TaskManager()
-    
     task = manager.create_task(
         description="Implement feature with >90% test coverage using TypeScript and FIDO2 compliance",
         context={}
     )
     
     assert len(task.constraints) > 0
+    # Constraints are frozen, so they can be hashed and deduplicated
+    assert len({hash(c) for c in task.constraints}) == len(task.constraints)
+
+
+def test_task_dict_round_trip(manager):
+    """Test that from_dict(to_dict()) rebuilds an equal task."""
+    task = manager.create_task(
+        description="Implement and document a parser using TypeScript",
+        context={"repo": "aim"},
+        deadline="2026-12-31"
+    )
+    task.subtasks[0].status = TaskStatus.COMPLETED
+    task.subtasks[0].output = {"files": ["parser.ts"]}
+    
+    assert task.constraints
+    assert Task.from_dict(task.to_dict()) == task
+    
+    # Tasks saved by older versions stored constraints as plain strings
+    legacy_task = Task.from_dict({**task.to_dict(), "constraints": ["Must use TypeScript"]})
+    
+    assert legacy_task.constraints == [
+        Constraint(type=ConstraintType.CUSTOM, description="Must use TypeScript", required=True)
+    ]
+    assert Task.from_dict(legacy_task.to_dict()) == legacy_task
+
+
+def test_nested_list_markers_parsed_once():
+    """Test that a list marker inside another item doesn't add a constraint."""
+    constraints = ConstraintParser.parse("1. Use caching - keep it simple\n2. Add metrics endpoint")
+    
+    assert [c.description for c in constraints] == [
+        "Use caching - keep it simple",
+        "Add metrics endpoint",
+    ]
+
+
+def test_requirements_only_at_line_start():
+    """Test that hyphens inside a line don't start a requirement."""
+    constraints = ConstraintParser.parse("Build a real-time dashboard\n  - Stream updates live")
+    
+    assert [c.description for c in constraints] == ["Stream updates live"]
+
 